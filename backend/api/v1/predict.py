@@ -0,0 +1,26 @@
+from typing import Dict, List
+from fastapi import APIRouter, HTTPException, Request
+from sklearn.exceptions import NotFittedError
+from core.ai_engine.models.registry import model_registry
+from core.schemas.prediction import PredictionOut, PredictionRequest
+
+router = APIRouter()
+
+def predict_batch(items: List[Dict]) -> List[Dict]:
+    """Score a micro-batch with the shared classifier"""
+    classifier = model_registry.get()
+    return [result["prediction"] for result in classifier.batch_predict(items)]
+
+@router.post("/predict", response_model=PredictionOut)
+async def predict_severity(payload: PredictionRequest, request: Request):
+    try:
+        prediction = await request.app.state.prediction_batcher.submit(payload.model_dump())
+    except NotFittedError:
+        raise HTTPException(status_code=503, detail="Severity model has not been trained yet")
+    if "error" in prediction:
+        raise HTTPException(status_code=422, detail=prediction["error"])
+    return prediction
+
+@router.get("/predict/cache")
+async def prediction_cache_stats():
+    return model_registry.get().cache_stats()
@@ -1,6 +1,12 @@
 from fastapi import APIRouter
+from .predict import router as predict_router
+from .scans import router as scans_router
+from .vulnerabilities import router as vulnerabilities_router
 
 router = APIRouter()
+router.include_router(scans_router)
+router.include_router(vulnerabilities_router)
+router.include_router(predict_router)
 
 @router.get("/health")
 async def health_check():
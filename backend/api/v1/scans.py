@@ -0,0 +1,32 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Request
+from core.jobs.worker import TOOL_CLASSES
+from core.schemas.scan import ScanCreate, ScanJob
+
+router = APIRouter()
+
+@router.post("/scans", status_code=202)
+async def create_scan(scan: ScanCreate, request: Request):
+    unknown = [tool for tool in scan.tools if tool.lower() not in TOOL_CLASSES]
+    if unknown or not scan.tools:
+        raise HTTPException(status_code=422, detail=f"Unsupported tools: {unknown}")
+    try:
+        float(scan.options.get("timeout") or 0)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=422, detail=f"Invalid timeout: {scan.options['timeout']}")
+    try:
+        int(scan.options.get("concurrent") or 0)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=422, detail=f"Invalid concurrent: {scan.options['concurrent']}")
+
+    queue = request.app.state.job_queue
+    job_id = await asyncio.to_thread(queue.enqueue, scan.target, scan.tools, scan.options)
+    request.app.state.worker_pool.notify()
+    return {"id": job_id, "status": "queued"}
+
+@router.get("/scans/{job_id}", response_model=ScanJob)
+async def get_scan(job_id: str, request: Request):
+    job = await asyncio.to_thread(request.app.state.job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    return job
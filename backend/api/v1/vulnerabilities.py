@@ -0,0 +1,23 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from core.models.database import get_db
+from core.models.persistence import query_vulnerabilities
+from core.schemas.vulnerability import VulnerabilityPage
+
+router = APIRouter()
+
+@router.get("/vulnerabilities", response_model=VulnerabilityPage)
+def list_vulnerabilities(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    severity: Optional[str] = None,
+    cwe_id: Optional[str] = None,
+    tool: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    try:
+        items, next_cursor = query_vulnerabilities(db, limit, cursor, severity, cwe_id, tool)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,108 @@
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+class MicroBatcher:
+    """Coalesce concurrent prediction requests into vectorized batches
+
+    Requests wait in a queue until ``max_batch_size`` have arrived or
+    ``max_delay`` seconds have passed since the first one, then the whole
+    batch goes through ``predict_batch`` on a worker thread so the event
+    loop stays free. While a batch runs, new requests keep queueing and
+    form the next, larger batch.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[Dict]], List[Dict]],
+        max_batch_size: int = 64,
+        max_delay: float = 0.005,
+        executor: Optional[ThreadPoolExecutor] = None
+    ):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.items = 0
+
+    def start(self):
+        """Start the batching loop on the running event loop"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="predict")
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop batching and fail requests that were still waiting or in flight"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        pending = []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._fail_stopped(pending)
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def submit(self, item: Dict) -> Dict:
+        """Queue one item and wait for its prediction"""
+        if self._task is None:
+            raise RuntimeError("Prediction batcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[Dict, asyncio.Future]] = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.max_delay
+                while len(batch) < self.max_batch_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                await self._flush(loop, batch)
+                batch = []
+        finally:
+            # The batch being collected or scored when the loop is cancelled
+            self._fail_stopped(batch)
+
+    @staticmethod
+    def _fail_stopped(batch: List[Tuple[Dict, asyncio.Future]]):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(RuntimeError("Prediction batcher stopped"))
+
+    async def _flush(self, loop: asyncio.AbstractEventLoop, batch: List[Tuple[Dict, asyncio.Future]]):
+        # Callers that gave up (e.g. disconnected clients) are dropped
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+
+        try:
+            results = await loop.run_in_executor(
+                self._executor, self.predict_batch, [item for item, _ in batch]
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.items += len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,280 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import re
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Generic advice by predicted severity, given before any rule-specific advice
+SEVERITY_RECOMMENDATIONS = {
+    "critical": [
+        "Immediate remediation required",
+        "Consider temporary system shutdown if exploitation detected"
+    ],
+    "high": [
+        "Prioritize fix within 24-48 hours",
+        "Implement temporary mitigation measures"
+    ],
+    "medium": [
+        "Plan remediation within 1-2 weeks"
+    ]
+}
+DEFAULT_SEVERITY_RECOMMENDATIONS = ["Address during regular maintenance cycle"]
+
+# Remediation rules. A rule fires when any of its CWE ids, nuclei tags, SWC
+# ids or keywords (matched as whole words against the finding type and
+# title) is present on a finding.
+RULES: List[Dict] = [
+    {
+        "cwe": ["CWE-89"],
+        "tags": ["sqli"],
+        "keywords": ["sql injection", "sqli"],
+        "recommendations": [
+            "Implement prepared statements",
+            "Use input validation and sanitization",
+            "Apply principle of least privilege to database users"
+        ]
+    },
+    {
+        "cwe": ["CWE-79"],
+        "tags": ["xss"],
+        "keywords": ["xss", "cross site scripting"],
+        "recommendations": [
+            "Implement Content Security Policy (CSP)",
+            "Use proper output encoding",
+            "Sanitize user input"
+        ]
+    },
+    {
+        "cwe": ["CWE-77", "CWE-78", "CWE-94"],
+        "tags": ["rce", "cmdi"],
+        "keywords": ["rce", "remote code execution", "command injection", "code injection"],
+        "recommendations": [
+            "Avoid using dangerous functions",
+            "Implement strict input validation",
+            "Use allowlist for permitted commands"
+        ]
+    },
+    {
+        "cwe": ["CWE-918"],
+        "tags": ["ssrf"],
+        "keywords": ["ssrf", "server side request forgery"],
+        "recommendations": [
+            "Validate outbound request destinations against an allowlist",
+            "Block requests to internal and link-local address ranges"
+        ]
+    },
+    {
+        "cwe": ["CWE-22", "CWE-23"],
+        "tags": ["lfi", "traversal"],
+        "keywords": ["path traversal", "directory traversal", "lfi", "local file inclusion"],
+        "recommendations": [
+            "Resolve and validate file paths against an allowed base directory",
+            "Do not build file paths from user input"
+        ]
+    },
+    {
+        "cwe": ["CWE-611"],
+        "tags": ["xxe"],
+        "keywords": ["xxe", "xml external entity"],
+        "recommendations": [
+            "Disable external entity and DTD processing in XML parsers"
+        ]
+    },
+    {
+        "cwe": ["CWE-502"],
+        "tags": ["deserialization"],
+        "keywords": ["deserialization", "insecure deserialization"],
+        "recommendations": [
+            "Do not deserialize untrusted data",
+            "Use data-only formats such as JSON with strict schemas"
+        ]
+    },
+    {
+        "cwe": ["CWE-352"],
+        "tags": ["csrf"],
+        "keywords": ["csrf", "cross site request forgery"],
+        "recommendations": [
+            "Require anti-CSRF tokens on state-changing requests",
+            "Set SameSite on session cookies"
+        ]
+    },
+    {
+        "cwe": ["CWE-601"],
+        "tags": ["redirect"],
+        "keywords": ["open redirect"],
+        "recommendations": [
+            "Only redirect to allowlisted destinations"
+        ]
+    },
+    {
+        "cwe": ["CWE-287", "CWE-306", "CWE-798", "CWE-1392"],
+        "tags": ["default-login", "auth-bypass"],
+        "keywords": ["authentication bypass", "default credentials", "default login", "hardcoded credentials"],
+        "recommendations": [
+            "Change default and hardcoded credentials",
+            "Require authentication on every sensitive endpoint"
+        ]
+    },
+    {
+        "cwe": ["CWE-200", "CWE-532", "CWE-538"],
+        "tags": ["exposure", "disclosure"],
+        "keywords": ["information disclosure", "exposure", "sensitive data"],
+        "recommendations": [
+            "Remove sensitive files and debug output from production",
+            "Restrict access to configuration and backup files"
+        ]
+    },
+    {
+        "cwe": ["CWE-16"],
+        "tags": ["misconfig"],
+        "keywords": ["misconfiguration", "missing security header"],
+        "recommendations": [
+            "Apply a hardened configuration baseline"
+        ]
+    },
+    {
+        "cwe": ["CWE-326", "CWE-327"],
+        "tags": ["ssl", "tls"],
+        "keywords": ["weak cipher", "ssl", "tls"],
+        "recommendations": [
+            "Disable weak protocols and cipher suites",
+            "Keep certificates valid and use TLS 1.2 or later"
+        ]
+    },
+    {
+        "cwe": ["CWE-1104", "CWE-937"],
+        "tags": ["cve"],
+        "keywords": ["outdated", "vulnerable dependency", "known vulnerability"],
+        "recommendations": [
+            "Upgrade the affected component to a patched version"
+        ]
+    },
+    {
+        "swc": ["SWC-107"],
+        "keywords": ["reentrancy"],
+        "recommendations": [
+            "Follow the checks-effects-interactions pattern",
+            "Use a reentrancy guard on external calls"
+        ]
+    },
+    {
+        "swc": ["SWC-101"],
+        "keywords": ["integer overflow", "integer underflow"],
+        "recommendations": [
+            "Use checked arithmetic (Solidity 0.8+ or SafeMath)"
+        ]
+    },
+    {
+        "swc": ["SWC-104"],
+        "keywords": ["unchecked call", "unchecked return value"],
+        "recommendations": [
+            "Check the return value of low-level calls"
+        ]
+    },
+    {
+        "swc": ["SWC-105", "SWC-106"],
+        "keywords": ["unprotected ether withdrawal", "unprotected selfdestruct"],
+        "recommendations": [
+            "Restrict withdrawals and selfdestruct to authorized accounts"
+        ]
+    },
+    {
+        "swc": ["SWC-112"],
+        "keywords": ["delegatecall"],
+        "recommendations": [
+            "Only delegatecall into trusted contracts"
+        ]
+    },
+    {
+        "swc": ["SWC-115"],
+        "keywords": ["tx origin"],
+        "recommendations": [
+            "Use msg.sender instead of tx.origin for authorization"
+        ]
+    },
+    {
+        "swc": ["SWC-116", "SWC-120"],
+        "keywords": ["timestamp dependence", "weak randomness"],
+        "recommendations": [
+            "Do not use block values as a source of randomness or precise time"
+        ]
+    }
+]
+
+class RecommendationEngine:
+    """Rule table compiled into hash lookups
+
+    CWE, tag and SWC rules are dicts from id to rule indices. Keywords are
+    indexed as token n-grams, so a finding is matched by looking up each
+    n-gram of its text once; the cost depends on the text length and the
+    longest keyword, not on the number of rules.
+    """
+
+    def __init__(self, rules: Optional[List[Dict]] = None):
+        self.rules = RULES if rules is None else rules
+        self._by_cwe: Dict[str, List[int]] = {}
+        self._by_tag: Dict[str, List[int]] = {}
+        self._by_swc: Dict[str, List[int]] = {}
+        self._by_keyword: Dict[Tuple[str, ...], List[int]] = {}
+        self._max_ngram = 1
+
+        for index, rule in enumerate(self.rules):
+            for cwe in rule.get("cwe", []):
+                self._by_cwe.setdefault(_normalize_id(cwe, "CWE"), []).append(index)
+            for tag in rule.get("tags", []):
+                self._by_tag.setdefault(tag.lower(), []).append(index)
+            for swc in rule.get("swc", []):
+                self._by_swc.setdefault(_normalize_id(swc, "SWC"), []).append(index)
+            for keyword in rule.get("keywords", []):
+                tokens = tuple(TOKEN_PATTERN.findall(keyword.lower()))
+                if tokens:
+                    self._by_keyword.setdefault(tokens, []).append(index)
+                    self._max_ngram = max(self._max_ngram, len(tokens))
+
+    def match(self, vulnerability_data: Dict) -> Tuple[int, ...]:
+        """Indices of the rules that apply to a finding, in rule-table order"""
+        matched = set()
+        for identifier in _values(vulnerability_data.get("cwe_id")):
+            matched.update(self._by_cwe.get(_normalize_id(identifier, "CWE"), ()))
+        for identifier in _values(vulnerability_data.get("swc_id")):
+            matched.update(self._by_swc.get(_normalize_id(identifier, "SWC"), ()))
+        for identifier in _values(vulnerability_data.get("identifiers")):
+            identifier = identifier.upper()
+            matched.update(self._by_cwe.get(identifier, ()))
+            matched.update(self._by_swc.get(identifier, ()))
+        for tag in _values(vulnerability_data.get("tags")):
+            matched.update(self._by_tag.get(tag.lower(), ()))
+
+        for field in ("type", "title"):
+            tokens = TOKEN_PATTERN.findall(str(vulnerability_data.get(field) or "").lower())
+            for start in range(len(tokens)):
+                for end in range(start + 1, min(start + self._max_ngram, len(tokens)) + 1):
+                    matched.update(self._by_keyword.get(tuple(tokens[start:end]), ()))
+
+        return tuple(sorted(matched))
+
+    def recommend(self, severity: str, rule_ids: Iterable[int]) -> List[str]:
+        """Severity advice followed by the advice of each matched rule"""
+        recommendations = list(SEVERITY_RECOMMENDATIONS.get(severity, DEFAULT_SEVERITY_RECOMMENDATIONS))
+        for index in rule_ids:
+            recommendations.extend(self.rules[index]["recommendations"])
+        return list(dict.fromkeys(recommendations))
+
+def _normalize_id(identifier, prefix: str) -> str:
+    """``89``, ``cwe-89`` and ``CWE-89`` all become ``CWE-89``"""
+    identifier = str(identifier).strip().upper()
+    if not identifier.startswith(prefix + "-"):
+        identifier = f"{prefix}-{identifier}"
+    return identifier
+
+def _values(value) -> List[str]:
+    """Accept a single value, a comma-separated string or a list"""
+    if value is None or value == "":
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(",") if v.strip()]
+    if isinstance(value, (list, tuple, set)):
+        return [str(v) for v in value if v is not None and v != ""]
+    return [str(value)]
+
+# Shared compiled instance for the default rule table
+default_recommendation_engine = RecommendationEngine()
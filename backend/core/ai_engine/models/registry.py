@@ -0,0 +1,29 @@
+from typing import Dict, Optional
+import os
+import threading
+from .vulnerability_classifier import VulnerabilityClassifier
+
+class ModelRegistry:
+    """Process-wide registry handing out one classifier per model file
+
+    Every caller in a process shares the same lazily loaded instance, so the
+    model is read from disk at most once per process.
+    """
+
+    def __init__(self):
+        self._models: Dict[str, VulnerabilityClassifier] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_path: Optional[str] = None, vectorizer_path: Optional[str] = None) -> VulnerabilityClassifier:
+        key = os.path.abspath(model_path) if model_path else ""
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = VulnerabilityClassifier(model_path, vectorizer_path)
+            return self._models[key]
+
+    def reset(self):
+        """Drop cached instances, e.g. after model files were replaced"""
+        with self._lock:
+            self._models.clear()
+
+model_registry = ModelRegistry()
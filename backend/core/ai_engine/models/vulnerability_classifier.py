@@ -1,41 +1,153 @@
-from typing import Dict, List, Optional
-import json
+from typing import Dict, Iterator, List, Optional
+import hashlib
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import SGDClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 import joblib
 import os
+import threading
+from ...security_tools.cache import ResultCache
+from ..training.store import CHUNK_SIZE, TrainingDataStore
+from .recommendations import RecommendationEngine, default_recommendation_engine
+
+# Labels the incremental model is fitted with; partial_fit needs them upfront
+SEVERITY_LEVELS = ["critical", "high", "medium", "low", "info"]
 
 class VulnerabilityClassifier:
-    def __init__(self, model_path: Optional[str] = None):
-        self.vectorizer = TfidfVectorizer(max_features=10000)
-        self.classifier = RandomForestClassifier(n_estimators=100, random_state=42)
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        vectorizer_path: Optional[str] = None,
+        mmap_mode: Optional[str] = "r",
+        incremental: bool = False,
+        training_store: Optional[TrainingDataStore] = None,
+        n_jobs: int = -1,
+        cache_size: int = 10000,
+        recommendation_engine: Optional[RecommendationEngine] = None
+    ):
+        """``incremental`` switches to a hashed-feature SGD model that can be
+        updated with partial_fit; the default is the TF-IDF random forest."""
+        self.incremental = incremental
+        self.n_jobs = n_jobs
+        self._training_store = training_store
+        self.recommendation_engine = recommendation_engine or default_recommendation_engine
         self.model_path = model_path or os.path.join(
             os.path.dirname(__file__),
-            "vulnerability_model.joblib"
+            "vulnerability_model_online.joblib" if incremental else "vulnerability_model.joblib"
         )
-        self.vectorizer_path = os.path.join(
+        self.vectorizer_path = vectorizer_path or os.path.join(
             os.path.dirname(__file__),
             "vectorizer.joblib"
         )
-        self._load_model()
+        self.mmap_mode = mmap_mode
+        self._vectorizer = None
+        self._classifier = None
+        self._load_lock = threading.Lock()
+        # Predictions keyed by normalized description, matched recommendation
+        # rules and model version;
+        # the version is bumped whenever the model is retrained
+        self.model_version = 0
+        self.prediction_cache = ResultCache(max_entries=cache_size, default_ttl=24 * 3600) if cache_size else None
+
+    @property
+    def vectorizer(self):
+        self._ensure_loaded()
+        return self._vectorizer
+
+    @vectorizer.setter
+    def vectorizer(self, vectorizer):
+        self._vectorizer = vectorizer
+
+    @property
+    def classifier(self):
+        self._ensure_loaded()
+        return self._classifier
+
+    @classifier.setter
+    def classifier(self, classifier):
+        self._classifier = classifier
+
+    def _ensure_loaded(self):
+        """Load the model on first use rather than at construction"""
+        if self._classifier is None or self._vectorizer is None:
+            with self._load_lock:
+                if self._classifier is None or self._vectorizer is None:
+                    self._load_model()
 
     def _load_model(self):
-        """Load pre-trained model if available"""
+        """Load pre-trained model if available
+
+        Plain ndarray attributes in the saved files (the SGD coefficients,
+        the TF-IDF ``idf_`` vector) are memory-mapped read-only
+        (``mmap_mode``) and shared through the OS page cache. The
+        RandomForest's tree nodes are rebuilt by each process and stay
+        private to it.
+        """
+        if self.incremental:
+            # Hashed features are stateless, so only the linear model is stored
+            vectorizer = HashingVectorizer(n_features=2 ** 18, alternate_sign=False)
+            classifier = SGDClassifier(loss="log_loss", random_state=42)
+        else:
+            vectorizer = TfidfVectorizer(max_features=10000)
+            classifier = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=self.n_jobs)
         try:
             if os.path.exists(self.model_path):
-                self.classifier = joblib.load(self.model_path)
-            if os.path.exists(self.vectorizer_path):
-                self.vectorizer = joblib.load(self.vectorizer_path)
+                classifier = joblib.load(self.model_path, mmap_mode=self.mmap_mode)
+            if not self.incremental and os.path.exists(self.vectorizer_path):
+                vectorizer = joblib.load(self.vectorizer_path, mmap_mode=self.mmap_mode)
         except Exception as e:
             print(f"Error loading model: {e}")
+        self._classifier = classifier
+        self._vectorizer = vectorizer
+
+    @property
+    def training_store(self) -> TrainingDataStore:
+        """Store of every labelled sample, opened on first use"""
+        if self._training_store is None:
+            self._training_store = TrainingDataStore()
+        return self._training_store
 
     def save_model(self):
-        """Save trained model"""
-        joblib.dump(self.classifier, self.model_path)
-        joblib.dump(self.vectorizer, self.vectorizer_path)
+        """Save trained model
+
+        Files are written uncompressed; joblib can only memory-map those.
+        Each file is written next to the target and renamed over it, so
+        arrays still mapped from the old file are never truncated.
+        """
+        _dump_atomic(self.classifier, self.model_path)
+        if not self.incremental:
+            _dump_atomic(self.vectorizer, self.vectorizer_path)
+        self.model_version += 1
+        if self.prediction_cache is not None:
+            self.prediction_cache.clear()
+
+    def cache_stats(self) -> Dict:
+        """Hit/miss counters of the prediction cache"""
+        cache = self.prediction_cache
+        if cache is None:
+            return {"enabled": False, "hits": 0, "misses": 0, "size": 0}
+        return {"enabled": True, "hits": cache.hits, "misses": cache.misses, "size": len(cache)}
+
+    def _cache_key(self, description: str, rule_ids: tuple) -> str:
+        # Both vectorizers lower-case and tokenize on whitespace, so case and
+        # spacing differences cannot change the prediction
+        description = " ".join(description.lower().split())
+        rules = ",".join(map(str, rule_ids))
+        payload = f"{self.model_version}\0{rules}\0{description}"
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _cached_prediction(self, key: str) -> Optional[Dict]:
+        prediction = self.prediction_cache.get(key) if self.prediction_cache is not None else None
+        if prediction is None:
+            return None
+        return {**prediction, "recommendations": list(prediction["recommendations"])}
+
+    def _cache_prediction(self, key: str, prediction: Dict):
+        if self.prediction_cache is not None:
+            self.prediction_cache.put(key, {**prediction, "recommendations": list(prediction["recommendations"])})
 
     def train(self, training_data: List[Dict]):
         """Train the vulnerability classifier"""
@@ -45,12 +157,37 @@ class VulnerabilityClassifier:
         # Transform text data
         X_vectorized = self.vectorizer.fit_transform(X)
 
+        return self._fit_and_evaluate(X_vectorized, y)
+
+    def train_from_store(self, store: Optional[TrainingDataStore] = None, chunk_size: int = CHUNK_SIZE):
+        """Retrain from scratch on every sample in the training store
+
+        Descriptions are streamed out of the store chunk by chunk straight
+        into the vectorizer, so only the sparse feature matrix and the label
+        column are held in memory.
+        """
+        store = store or self.training_store
+        if self.incremental:
+            return self._partial_fit_chunks(store, chunk_size)
+
+        severities: List[str] = []
+
+        def descriptions() -> Iterator[str]:
+            for chunk_descriptions, chunk_severities in store.iter_chunks(chunk_size):
+                severities.extend(chunk_severities)
+                yield from chunk_descriptions
+
+        X_vectorized = self.vectorizer.fit_transform(descriptions())
+        return self._fit_and_evaluate(X_vectorized, severities)
+
+    def _fit_and_evaluate(self, X_vectorized, y: List[str]) -> Dict:
         # Split dataset
         X_train, X_test, y_train, y_test = train_test_split(
             X_vectorized, y, test_size=0.2, random_state=42
         )
 
-        # Train classifier
+        # Train classifier; trees are built in parallel across cores
+        self.classifier.set_params(n_jobs=self.n_jobs)
         self.classifier.fit(X_train, y_train)
 
         # Evaluate
@@ -61,16 +198,48 @@ class VulnerabilityClassifier:
         self.save_model()
 
         return {
-            "training_samples": len(X),
+            "training_samples": len(y),
             "evaluation_report": report
         }
 
+    def _partial_fit_chunks(self, store: TrainingDataStore, chunk_size: int) -> Dict:
+        """Rebuild the incremental model with one partial_fit per stored chunk
+
+        Each chunk is scored before the model learns from it (progressive
+        validation), so no samples have to be held out.
+        """
+        self.classifier = SGDClassifier(loss="log_loss", random_state=42)
+        samples = 0
+        y_test: List[str] = []
+        y_pred: List[str] = []
+        for chunk_descriptions, chunk_severities in store.iter_chunks(chunk_size):
+            X = self.vectorizer.transform(chunk_descriptions)
+            if samples:
+                y_test.extend(chunk_severities)
+                y_pred.extend(self.classifier.predict(X))
+            self.classifier.partial_fit(X, chunk_severities, classes=SEVERITY_LEVELS)
+            samples += len(chunk_severities)
+
+        self.save_model()
+
+        return {
+            "training_samples": samples,
+            "evaluation_report": classification_report(y_test, y_pred, zero_division=0) if y_test else "",
+            "mode": "incremental"
+        }
+
     def predict(self, vulnerability_data: Dict) -> Dict:
         """Predict vulnerability severity and provide recommendations"""
         description = vulnerability_data.get('description', '')
         if not description:
             return {"error": "No description provided"}
 
+        rule_ids = self.recommendation_engine.match(vulnerability_data)
+        key = self._cache_key(description, rule_ids)
+        cached = self._cached_prediction(key)
+        if cached is not None:
+            return cached
+
         # Transform input
         X = self.vectorizer.transform([description])
 
@@ -78,82 +247,116 @@ class VulnerabilityClassifier:
         severity = self.classifier.predict(X)[0]
         probability = np.max(self.classifier.predict_proba(X))
 
-        return {
+        prediction = {
             "severity": severity,
             "confidence": float(probability),
-            "recommendations": self._generate_recommendations(vulnerability_data, severity)
+            "recommendations": self.recommendation_engine.recommend(severity, rule_ids)
         }
+        self._cache_prediction(key, prediction)
+        return prediction
 
     def _generate_recommendations(self, vulnerability_data: Dict, severity: str) -> List[str]:
         """Generate remediation recommendations based on vulnerability type and severity"""
-        recommendations = []
-
-        # Basic severity-based recommendations
-        if severity == "critical":
-            recommendations.append("Immediate remediation required")
-            recommendations.append("Consider temporary system shutdown if exploitation detected")
-        elif severity == "high":
-            recommendations.append("Prioritize fix within 24-48 hours")
-            recommendations.append("Implement temporary mitigation measures")
-        elif severity == "medium":
-            recommendations.append("Plan remediation within 1-2 weeks")
-        else:
-            recommendations.append("Address during regular maintenance cycle")
-
-        # Vulnerability type-specific recommendations
-        vuln_type = vulnerability_data.get('type', '').lower()
-        if 'sql injection' in vuln_type:
-            recommendations.extend([
-                "Implement prepared statements",
-                "Use input validation and sanitization",
-                "Apply principle of least privilege to database users"
-            ])
-        elif 'xss' in vuln_type:
-            recommendations.extend([
-                "Implement Content Security Policy (CSP)",
-                "Use proper output encoding",
-                "Sanitize user input"
-            ])
-        elif 'rce' in vuln_type:
-            recommendations.extend([
-                "Avoid using dangerous functions",
-                "Implement strict input validation",
-                "Use allowlist for permitted commands"
-            ])
-
-        return recommendations
+        return self.recommendation_engine.recommend(
+            severity, self.recommendation_engine.match(vulnerability_data)
+        )
 
     def batch_predict(self, vulnerabilities: List[Dict]) -> List[Dict]:
-        """Process multiple vulnerabilities in batch"""
-        results = []
-        for vuln in vulnerabilities:
-            prediction = self.predict(vuln)
-            results.append({
-                "vulnerability": vuln,
-                "prediction": prediction
-            })
-        return results
-
-    def update_model(self, new_training_data: List[Dict]):
-        """Update existing model with new training data"""
-        # Load existing training data if available
-        existing_data = []
-        try:
-            if os.path.exists("training_data.json"):
-                with open("training_data.json", "r") as f:
-                    existing_data = json.load(f)
-        except Exception:
-            pass
+        """Process multiple vulnerabilities in batch
+
+        Cached predictions are reused; the remaining descriptions are
+        vectorized in one sparse matrix and scored with a single
+        predict_proba call, taking the argmax column as the label.
+        """
+        predictions: List[Optional[Dict]] = [None] * len(vulnerabilities)
+        indices = []
+        keys = []
+        matched_rules = []
+        descriptions = []
+        for i, vuln in enumerate(vulnerabilities):
+            description = vuln.get('description', '')
+            if not description:
+                predictions[i] = {"error": "No description provided"}
+                continue
+            rule_ids = self.recommendation_engine.match(vuln)
+            key = self._cache_key(description, rule_ids)
+            predictions[i] = self._cached_prediction(key)
+            if predictions[i] is None:
+                indices.append(i)
+                keys.append(key)
+                matched_rules.append(rule_ids)
+                descriptions.append(description)
+
+        if descriptions:
+            X = self.vectorizer.transform(descriptions)
+            probabilities = self.classifier.predict_proba(X)
+            best = np.argmax(probabilities, axis=1)
+            severities = self.classifier.classes_[best]
+            confidences = probabilities[np.arange(len(best)), best]
+
+            # Recommendations only depend on severity and the matched rules,
+            # so build each distinct combination once
+            recommendations: Dict[tuple, List[str]] = {}
+            for i, cache_key, rule_ids, severity, confidence in zip(
+                indices, keys, matched_rules, severities, confidences
+            ):
+                key = (severity, rule_ids)
+                if key not in recommendations:
+                    recommendations[key] = self.recommendation_engine.recommend(*key)
+                predictions[i] = {
+                    "severity": severity,
+                    "confidence": float(confidence),
+                    "recommendations": list(recommendations[key])
+                }
+                self._cache_prediction(cache_key, predictions[i])
 
-        # Combine existing and new data
-        combined_data = existing_data + new_training_data
+        return [
+            {"vulnerability": vuln, "prediction": prediction}
+            for vuln, prediction in zip(vulnerabilities, predictions)
+        ]
 
-        # Save updated training data
-        with open("training_data.json", "w") as f:
-            json.dump(combined_data, f)
+    def update_model(self, new_training_data: List[Dict], incremental: Optional[bool] = None):
+        """Update existing model with new training data
+
+        In incremental mode (the instance default unless overridden) only the
+        new batch is vectorized and fed to partial_fit, so the cost scales
+        with the batch. Otherwise the batch is appended to the training store
+        and the model is retrained from scratch on everything stored.
+        """
+        if self.incremental if incremental is None else incremental:
+            return self.partial_update(new_training_data)
+
+        # Fold any data left in the old JSON files into the store once
+        store = self.training_store
+        store.import_legacy()
+        store.append(new_training_data)
 
         # Retrain model
-        return self.train(combined_data)
+        return self.train_from_store(store)
+
+    def partial_update(self, new_training_data: List[Dict]) -> Dict:
+        """Fold a batch of labelled findings into the incremental model"""
+        if not self.incremental:
+            raise ValueError("partial_update requires a classifier created with incremental=True")
+
+        # partial_fit updates weights in place, which must not happen on
+        # read-only memory-mapped arrays
+        for attr, value in vars(self.classifier).items():
+            if isinstance(value, np.ndarray) and not value.flags.writeable:
+                setattr(self.classifier, attr, np.array(value))
+
+        X = self.vectorizer.transform([item['description'] for item in new_training_data])
+        y = [item['severity'] for item in new_training_data]
+        self.classifier.partial_fit(X, y, classes=SEVERITY_LEVELS)
+        self.save_model()
+
+        # Keep the samples for the next full retrain without rewriting old ones
+        self.training_store.append(new_training_data)
+
+        return {
+            "training_samples": len(new_training_data),
+            "mode": "incremental"
+        }
 
     def evaluate_prediction(self, prediction: Dict, actual_severity: str) -> Dict:
         """Evaluate prediction accuracy and update model if necessary"""
@@ -163,3 +366,8 @@ class VulnerabilityClassifier:
             "confidence": prediction["confidence"],
             "accuracy": prediction["severity"] == actual_severity
         }
+
+def _dump_atomic(value, path: str):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    joblib.dump(value, tmp_path)
+    os.replace(tmp_path, path)
@@ -0,0 +1,86 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import os
+import sqlite3
+import threading
+
+# Samples are appended and read back in chunks of this many rows
+CHUNK_SIZE = 50000
+
+class TrainingDataStore:
+    """Append-only store of labelled findings backed by SQLite
+
+    Descriptions and severities are kept in their own columns and read back
+    in rowid order, one chunk at a time, so training never needs the whole
+    history in memory as Python objects.
+    """
+
+    def __init__(self, path: str = "training_data.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS samples (
+                id INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                severity TEXT NOT NULL
+            )
+        """)
+
+    def append(self, samples: Iterable[Dict]) -> int:
+        """Append labelled samples and return how many were written"""
+        written = 0
+        batch: List[Tuple[str, str]] = []
+        with self._lock:
+            for item in samples:
+                batch.append((item['description'], item['severity']))
+                if len(batch) >= CHUNK_SIZE:
+                    written += self._insert(batch)
+                    batch = []
+            if batch:
+                written += self._insert(batch)
+        return written
+
+    def iter_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[List[str], List[str]]]:
+        """Yield (descriptions, severities) column chunks in insertion order"""
+        last_id = 0
+        while True:
+            rows = self._conn.execute(
+                "SELECT id, description, severity FROM samples WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, chunk_size)
+            ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [row[1] for row in rows], [row[2] for row in rows]
+
+    def import_legacy(self, json_path: str = "training_data.json", jsonl_path: Optional[str] = "training_data.jsonl") -> int:
+        """Move samples from the old JSON training files into the store
+
+        Imported files are renamed with an ``.imported`` suffix so they are
+        not picked up twice.
+        """
+        imported = 0
+        if json_path and os.path.exists(json_path):
+            with open(json_path, "r") as f:
+                imported += self.append(json.load(f))
+            os.replace(json_path, json_path + ".imported")
+        if jsonl_path and os.path.exists(jsonl_path):
+            with open(jsonl_path, "r") as f:
+                imported += self.append(json.loads(line) for line in f if line.strip())
+            os.replace(jsonl_path, jsonl_path + ".imported")
+        return imported
+
+    def close(self):
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0]
+
+    def _insert(self, batch: List[Tuple[str, str]]) -> int:
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO samples (description, severity) VALUES (?, ?)", batch
+            )
+        return len(batch)
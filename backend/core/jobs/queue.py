@@ -0,0 +1,142 @@
+from typing import Dict, List, Optional
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Times a job may be claimed before an interrupted run is no longer retried
+MAX_ATTEMPTS = 3
+
+class JobQueue:
+    """Durable scan job queue backed by SQLite
+
+    Jobs survive a backend restart: anything still marked running when the
+    queue is opened was interrupted and is put back in the queue, unless it
+    has already been attempted ``max_attempts`` times.
+    """
+
+    def __init__(self, path: str, max_attempts: int = MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                target TEXT NOT NULL,
+                tools TEXT NOT NULL,
+                options TEXT NOT NULL,
+                completed_tools INTEGER NOT NULL DEFAULT 0,
+                total_tools INTEGER NOT NULL,
+                results TEXT NOT NULL DEFAULT '[]',
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+        """)
+        self.recover()
+
+    def enqueue(self, target: str, tools: List[str], options: Optional[Dict] = None) -> str:
+        """Add a job to the queue and return its id
+
+        Tool names are lower-cased and deduplicated, so progress counts each
+        tool once.
+        """
+        tools = list(dict.fromkeys(tool.lower() for tool in tools))
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, target, tools, options, total_tools, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, target, json.dumps(tools), json.dumps(options or {}),
+                 len(tools), datetime.utcnow().isoformat())
+            )
+        return job_id
+
+    def claim(self) -> Optional[Dict]:
+        """Atomically take the oldest queued job and mark it running"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1, "
+                    "completed_tools = 0, results = '[]' WHERE id = ?",
+                    (RUNNING, datetime.utcnow().isoformat(), row["id"])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"])
+
+    def record_result(self, job_id: str, result: Dict):
+        """Append one tool result to a running job and advance its progress"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET results = json_insert(results, '$[#]', json(?)), "
+                "completed_tools = completed_tools + 1 WHERE id = ?",
+                (json.dumps(result, default=str), job_id)
+            )
+
+    def complete(self, job_id: str):
+        self._finish(job_id, COMPLETED, None)
+
+    def fail(self, job_id: str, error: str):
+        self._finish(job_id, FAILED, error)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = dict(row)
+        for key in ("tools", "options", "results"):
+            job[key] = json.loads(job[key])
+        job["progress"] = job["completed_tools"] / job["total_tools"] if job["total_tools"] else 1.0
+        return job
+
+    def recover(self) -> int:
+        """Requeue jobs left running by a previous process
+
+        Jobs that have used up their attempts are failed instead, so a job
+        that brings the process down is not retried on every restart.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status = ? AND attempts >= ?",
+                (FAILED, f"Interrupted after {self.max_attempts} attempts",
+                 datetime.utcnow().isoformat(), RUNNING, self.max_attempts)
+            )
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ? WHERE status = ?", (QUEUED, RUNNING)
+            )
+        return cursor.rowcount
+
+    def close(self):
+        self._conn.close()
+
+    def _finish(self, job_id: str, status: str, error: Optional[str]):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, error, datetime.utcnow().isoformat(), job_id)
+            )
@@ -0,0 +1,131 @@
+from typing import Callable, Dict, List, Optional, Type
+import asyncio
+from sqlalchemy.orm import Session
+from ..models.persistence import bulk_insert_findings
+from ..security_tools.findings import FindingDeduplicator
+from ..security_tools.base import SecurityTool, ToolOrchestrator
+from ..security_tools.mobsf.scanner import MobSFScanner
+from ..security_tools.mythril.scanner import MythrilScanner
+from ..security_tools.nmap.scanner import NmapScanner
+from ..security_tools.nuclei.scanner import NucleiScanner
+from ..security_tools.recon.scanner import ReconScanner
+from .queue import JobQueue
+
+# Tools a scan job may request, by lower-cased name
+TOOL_CLASSES: Dict[str, Type[SecurityTool]] = {
+    "nmap": NmapScanner,
+    "nuclei": NucleiScanner,
+    "recon": ReconScanner,
+    "mobsf": MobSFScanner,
+    "mythril": MythrilScanner
+}
+
+# scan() arguments per tool for each scan depth a job may request
+DEPTH_SCAN_OPTIONS: Dict[str, Dict[str, Dict]] = {
+    "quick": {"nmap": {"scan_type": "quick"}, "mythril": {"mode": "quick"}},
+    "normal": {"nmap": {"scan_type": "quick"}, "mythril": {"mode": "standard"}},
+    "deep": {"nmap": {"scan_type": "full"}, "mythril": {"mode": "deep"}}
+}
+
+class ScanWorkerPool:
+    """Worker coroutines that drain the job queue through a ToolOrchestrator"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        workers: int = 2,
+        poll_interval: float = 2.0,
+        tool_config: Optional[Dict[str, Dict]] = None,
+        session_factory: Optional[Callable[[], Session]] = None
+    ):
+        self.queue = queue
+        self.session_factory = session_factory
+        self.deduplicator = FindingDeduplicator()
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.tool_config = tool_config or {}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self):
+        """Start the worker coroutines on the running event loop"""
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Cancel the workers; jobs they were running are requeued on next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """Wake idle workers after a job has been enqueued"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def build_orchestrator(self, tools: List[str], options: Optional[Dict] = None) -> ToolOrchestrator:
+        """Orchestrator for a job's tools, configured from its options
+
+        ``depth`` picks per-tool scan arguments from ``DEPTH_SCAN_OPTIONS``,
+        ``timeout`` bounds each tool run in seconds and ``concurrent`` caps
+        how many of the job's tools run at once. ``scanType`` only chooses
+        the tool list on the scan form, which the job already holds.
+        """
+        options = options or {}
+        depth = DEPTH_SCAN_OPTIONS.get(str(options.get("depth", "normal")).lower(), {})
+        timeout = float(options["timeout"]) if options.get("timeout") else None
+        names = list(dict.fromkeys(name.lower() for name in tools))
+        concurrency = len(names)
+        if options.get("concurrent"):
+            concurrency = max(1, min(concurrency, int(options["concurrent"])))
+        orchestrator = ToolOrchestrator(
+            max_concurrency=concurrency,
+            scan_options={name: depth[name] for name in names if name in depth},
+            timeout=timeout if timeout and timeout > 0 else None
+        )
+        for name in names:
+            orchestrator.register_tool(TOOL_CLASSES[name](self.tool_config.get(name, {})))
+        return orchestrator
+
+    async def _work(self):
+        while True:
+            job = await asyncio.to_thread(self.queue.claim)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run_job(job)
+
+    async def _run_job(self, job: Dict):
+        orchestrator = None
+        try:
+            orchestrator = self.build_orchestrator(job["tools"], job["options"])
+            errors = []
+            async for result in orchestrator.run_concurrent_scans([job["target"]], workers=orchestrator.max_concurrency):
+                await asyncio.to_thread(self.queue.record_result, job["id"], result)
+                if result.get("error"):
+                    errors.append(f"{result.get('tool')}: {result['error']}")
+                if self.session_factory is not None:
+                    await asyncio.to_thread(self._persist, result)
+            if errors and len(errors) == len(orchestrator.tools):
+                # No tool produced a usable result
+                await asyncio.to_thread(self.queue.fail, job["id"], "; ".join(errors))
+            else:
+                await asyncio.to_thread(self.queue.complete, job["id"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await asyncio.to_thread(self.queue.fail, job["id"], str(e))
+        finally:
+            if orchestrator is not None:
+                await orchestrator.close()
+
+    def _persist(self, result: Dict):
+        """Store a tool result's findings in the vulnerabilities table"""
+        with self.session_factory() as db:
+            bulk_insert_findings(db, [result], deduplicator=self.deduplicator)
@@ -0,0 +1,166 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import base64
+import json
+from datetime import datetime, timezone
+from sqlalchemy import and_, bindparam, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from ..security_tools.findings import FindingDeduplicator, normalize_result
+from .vulnerability import Vulnerability
+
+# Rows sent per INSERT ... VALUES executemany round trip
+INSERT_BATCH_SIZE = 1000
+
+# Fingerprints per IN (...) lookup, kept under SQLite's bound parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING
+UPSERT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert
+}
+
+def findings_to_rows(records: Iterable[Dict]) -> Iterator[Dict]:
+    """Turn normalized finding records into Vulnerability row dicts"""
+    for record in records:
+        yield {
+            "title": record["title"],
+            "description": record["description"],
+            "severity": record["severity"],
+            "cwe_id": record["cwe_id"],
+            "tool": record["tools"][0],
+            "target": record["target"],
+            "fingerprint": record["fingerprint"],
+            "detected_by": record["tools"],
+            "affected_components": {
+                "location": record["location"],
+                "identifiers": record["identifiers"],
+                "finding": record["raw"]
+            },
+            "discovery_date": _parse_timestamp(record["timestamp"])
+        }
+
+def bulk_insert_findings(
+    db: Session,
+    scan_results: Iterable[Dict],
+    batch_size: int = INSERT_BATCH_SIZE,
+    deduplicator: Optional[FindingDeduplicator] = None
+) -> int:
+    """Normalize, deduplicate and insert every finding in ``scan_results``
+
+    Findings whose fingerprint is already stored, whether from another tool
+    or an earlier run, are not inserted again; the reporting tool is added
+    to the stored row's ``detected_by`` instead. Each batch is committed on
+    its own using executemany; writers sharing a ``deduplicator`` are
+    serialized, and a fingerprint inserted concurrently by another process
+    is skipped rather than failing the batch. Returns the number of rows
+    inserted.
+    """
+    deduplicator = deduplicator or FindingDeduplicator()
+    inserted = 0
+    batch: List[Dict] = []
+    for result in scan_results:
+        for record in normalize_result(result):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                inserted += _write_batch(db, batch, deduplicator)
+                batch = []
+    if batch:
+        inserted += _write_batch(db, batch, deduplicator)
+    return inserted
+
+def query_vulnerabilities(
+    db: Session,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    severity: Optional[str] = None,
+    cwe_id: Optional[str] = None,
+    tool: Optional[str] = None
+) -> Tuple[List[Vulnerability], Optional[str]]:
+    """Return one page of vulnerabilities, newest first, and the next page's cursor
+
+    Pages are keyset-paginated on (discovery_date, id), so the cost of a
+    page does not depend on how deep into the result set it is.
+    """
+    query = select(Vulnerability)
+    if severity:
+        query = query.where(Vulnerability.severity == severity)
+    if cwe_id:
+        query = query.where(Vulnerability.cwe_id == cwe_id)
+    if tool:
+        query = query.where(Vulnerability.tool == tool)
+    if cursor:
+        discovered, last_id = decode_cursor(cursor)
+        query = query.where(or_(
+            Vulnerability.discovery_date < discovered,
+            and_(Vulnerability.discovery_date == discovered, Vulnerability.id < last_id)
+        ))
+
+    query = query.order_by(Vulnerability.discovery_date.desc(), Vulnerability.id.desc()).limit(limit + 1)
+    rows = list(db.scalars(query))
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].discovery_date, rows[-1].id)
+    return rows, next_cursor
+
+def encode_cursor(discovered: datetime, row_id: int) -> str:
+    payload = json.dumps([discovered.isoformat(), row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        discovered, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(discovered), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def _write_batch(db: Session, records: List[Dict], deduplicator: FindingDeduplicator) -> int:
+    with deduplicator.lock:
+        new, merged = deduplicator.add_many(records, lambda fps: _stored_tools(db, fps))
+        try:
+            if new:
+                db.execute(_insert_ignoring_duplicates(db), list(findings_to_rows(new)))
+            if merged:
+                db.execute(
+                    update(Vulnerability.__table__)
+                    .where(Vulnerability.fingerprint == bindparam("fp"))
+                    .values(detected_by=bindparam("tools")),
+                    [{"fp": fp, "tools": tools} for fp, tools in merged.items()]
+                )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        deduplicator.remember_many(new, merged)
+    return len(new)
+
+def _insert_ignoring_duplicates(db: Session):
+    """INSERT for new findings that leaves an already stored fingerprint alone"""
+    dialect_insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        return insert(Vulnerability)
+    return dialect_insert(Vulnerability).on_conflict_do_nothing(index_elements=["fingerprint"])
+
+def _stored_tools(db: Session, fingerprints: List[str]) -> Dict[str, List[str]]:
+    """Look up which of ``fingerprints`` are already stored, with their tools"""
+    stored = {}
+    for start in range(0, len(fingerprints), LOOKUP_CHUNK_SIZE):
+        chunk = fingerprints[start:start + LOOKUP_CHUNK_SIZE]
+        rows = db.execute(
+            select(Vulnerability.fingerprint, Vulnerability.detected_by).where(Vulnerability.fingerprint.in_(chunk))
+        )
+        for fp, tools in rows:
+            stored[fp] = tools or []
+    return stored
+
+def _parse_timestamp(value: Optional[str]) -> datetime:
+    """Parse an ISO timestamp into the naive UTC datetimes stored in the table"""
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return datetime.utcnow()
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
@@ -1,9 +1,16 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Float, JSON, Index
 from datetime import datetime
 from .base import Base
 
 class Vulnerability(Base):
     __tablename__ = "vulnerabilities"
+    __table_args__ = (
+        # Keyset pagination walks (discovery_date, id) newest first,
+        # optionally narrowed by severity or CWE
+        Index("ix_vulnerabilities_discovery", "discovery_date", "id"),
+        Index("ix_vulnerabilities_severity_discovery", "severity", "discovery_date", "id"),
+        Index("ix_vulnerabilities_cwe_discovery", "cwe_id", "discovery_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
@@ -11,6 +18,10 @@ class Vulnerability(Base):
     severity = Column(String)
     cvss_score = Column(Float)
     cwe_id = Column(String)
+    tool = Column(String)
+    target = Column(String)
+    fingerprint = Column(String, unique=True, index=True)
+    detected_by = Column(JSON)
     affected_components = Column(JSON)
     discovery_date = Column(DateTime, default=datetime.utcnow)
     remediation = Column(String)
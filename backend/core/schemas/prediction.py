@@ -0,0 +1,15 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+class PredictionRequest(BaseModel):
+    description: str = Field(min_length=1)
+    type: str = ""
+    title: Optional[str] = None
+    cwe_id: Optional[str] = None
+    swc_id: Optional[str] = None
+    tags: List[str] = Field(default_factory=list)
+
+class PredictionOut(BaseModel):
+    severity: str
+    confidence: float
+    recommendations: List[str]
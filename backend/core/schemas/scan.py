@@ -0,0 +1,23 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+class ScanCreate(BaseModel):
+    target: str
+    tools: List[str] = Field(default_factory=lambda: ["nmap", "nuclei"])
+    options: Dict[str, Any] = Field(default_factory=dict)
+
+class ScanJob(BaseModel):
+    id: str
+    status: str
+    target: str
+    tools: List[str]
+    options: Dict[str, Any]
+    progress: float
+    completed_tools: int
+    total_tools: int
+    results: List[Dict[str, Any]]
+    error: Optional[str] = None
+    attempts: int
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
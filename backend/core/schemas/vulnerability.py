@@ -0,0 +1,23 @@
+from typing import Any, List, Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+
+class VulnerabilityOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: Optional[str] = None
+    description: Optional[str] = None
+    severity: Optional[str] = None
+    cvss_score: Optional[float] = None
+    cwe_id: Optional[str] = None
+    tool: Optional[str] = None
+    target: Optional[str] = None
+    affected_components: Optional[Any] = None
+    discovery_date: datetime
+    remediation: Optional[str] = None
+    proof_of_concept: Optional[str] = None
+
+class VulnerabilityPage(BaseModel):
+    items: List[VulnerabilityOut]
+    next_cursor: Optional[str] = None
@@ -1,44 +1,278 @@
 import json
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
 import asyncio
+import codecs
+import re
 import subprocess
 from datetime import datetime
+from .cache import ResultCache, default_result_cache
+from .delta import DeltaStore, fingerprint_finding
+
+# Max bytes of subprocess output buffered by execute_command_stream
+STREAM_BUFFER_LIMIT = 64 * 1024
+
+# Exit statuses treated as success unless a tool passes its own
+SUCCESS_EXIT_CODES = (0,)
+
+# Dotted version number in a tool's version output
+VERSION_PATTERN = re.compile(r"\d+(?:\.\d+)+")
 
 class SecurityTool(ABC):
+    # Delta scans may skip this tool when the target's attack surface is unchanged
+    surface_dependent = False
+
+    # For scanners that wrap several tools: those whose results are
+    # cacheable, with the command reporting their version
+    version_commands: Dict[str, List[str]] = {}
+
     def __init__(self, name: str, config: Dict):
         self.name = name
         self.config = config
         self.process: Optional[asyncio.subprocess.Process] = None
+        self.cache: Optional[ResultCache] = None
+        if config.get("cache_enabled", True):
+            self.cache = config.get("result_cache", default_result_cache)
+        self._versions: Dict[Tuple[str, ...], str] = {}
 
     @abstractmethod
     async def setup(self) -> bool:
         """Install and configure the security tool"""
         pass
 
-    @abstractmethod
-    async def scan(self, target: str) -> Dict:
-        """Execute the security scan"""
-        pass
+    async def scan(self, target: str, tool: str = None, bypass_cache: bool = False) -> Dict:
+        """Execute the security scan with the given tool
+
+        Tools listed in ``version_commands`` go through the result cache.
+        Scanners that wrap a single tool override this instead.
+        """
+        if tool not in self.version_commands:
+            return await self._run_scan(target, tool)
+
+        return await self.cached_scan(
+            target, [tool], lambda: self._run_scan(target, tool), self.version_commands[tool], bypass_cache
+        )
+
+    async def _run_scan(self, target: str, tool: str = None) -> Dict:
+        """Run one tool against a target, uncached"""
+        raise NotImplementedError(f"{type(self).__name__} does not support scanning with {tool}")
 
     @abstractmethod
     async def parse_results(self, raw_output: str) -> List[Dict]:
         """Parse the scan results"""
         pass
 
-    async def execute_command(self, command: List[str]) -> tuple[str, str]:
+    async def close(self):
+        """Release resources kept open between scans, such as HTTP sessions"""
+        pass
+
+    async def execute_command(self, command: List[str], input_data: Optional[bytes] = None) -> tuple[str, str]:
         """Execute a shell command and return stdout and stderr"""
+        stdout, stderr, _ = await self.execute_command_status(command, input_data)
+        return stdout, stderr
+
+    async def execute_command_status(self, command: List[str], input_data: Optional[bytes] = None) -> Tuple[str, str, int]:
+        """Execute a shell command and return stdout, stderr and its exit status
+
+        The process is killed if the caller is cancelled, e.g. by a timeout.
+        """
         process = await asyncio.create_subprocess_exec(
             *command,
+            stdin=asyncio.subprocess.PIPE if input_data is not None else None,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE
         )
-        stdout, stderr = await process.communicate()
-        return stdout.decode(), stderr.decode()
+        try:
+            stdout, stderr = await process.communicate(input_data)
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+        return stdout.decode(), stderr.decode(), process.returncode
+
+    def command_error(
+        self,
+        command: List[str],
+        returncode: Optional[int],
+        stderr: str = "",
+        success_codes: Tuple[int, ...] = SUCCESS_EXIT_CODES
+    ) -> Optional[str]:
+        """Error message for a command that failed, or None if it succeeded"""
+        if returncode in success_codes:
+            return None
+        lines = [line.strip() for line in stderr.splitlines() if line.strip()]
+        detail = f": {lines[-1]}" if lines else ""
+        return f"{command[0]} exited with status {returncode}{detail}"
+
+    async def get_version(self, command: List[str]) -> str:
+        """Return the version a version command reports, memoized per command"""
+        key = tuple(command)
+        if key not in self._versions:
+            try:
+                stdout, stderr = await self.execute_command(command)
+                self._versions[key] = parse_version(stdout.strip() or stderr.strip())
+            except Exception:
+                self._versions[key] = ""
+        return self._versions[key]
+
+    async def cached_scan(
+        self,
+        target: str,
+        args: List,
+        run: Callable[[], Awaitable[Dict]],
+        version_command: Optional[List[str]] = None,
+        bypass_cache: bool = False
+    ) -> Dict:
+        """Serve a scan from the result cache, or run it and cache the result
+
+        The key covers the tool name, normalized target, ``args`` and the
+        output of ``version_command``. ``bypass_cache`` forces a fresh run
+        whose result still refreshes the cache. Failed scans (``error`` set)
+        and incomplete ones (``partial`` set) are not cached.
+        """
+        if self.cache is None:
+            return await run()
+
+        version = await self.get_version(version_command) if version_command else ""
+        key = await asyncio.to_thread(self.cache.make_key, self.name, target, args, version)
+        if not bypass_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return {**cached, "cached": True}
+
+        result = await run()
+        if not result.get("error") and not result.get("partial"):
+            self.cache.put(key, result, self.cache.ttl_for(self.name))
+        return result
+
+    def attack_surface(self, result: Dict) -> Optional[str]:
+        """Fingerprint of the attack surface a scan result reveals, if any
+
+        Tools that discover open ports or technologies override this so
+        delta scans can skip surface-dependent tools when nothing changed.
+        """
+        return None
+
+    async def scan_delta(self, target: str, store: DeltaStore, surface: Optional[str] = None, **kwargs) -> Dict:
+        """Scan and report findings as new, resolved and unchanged since the last run
+
+        When this tool is ``surface_dependent`` and ``surface`` matches the
+        one recorded at its last run, the scan is skipped and the previous
+        findings are reported as unchanged.
+        """
+        if self.surface_dependent and surface is not None:
+            if await asyncio.to_thread(store.get_surface, self.name, target) == surface:
+                previous = await asyncio.to_thread(store.previous, self.name, target)
+                return {
+                    "tool": self.name,
+                    "target": target,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "skipped": True,
+                    "findings": previous,
+                    "delta": {"new": [], "resolved": [], "unchanged": previous}
+                }
+
+        result = await self.scan(target, **kwargs)
+        if result.get("error"):
+            return result
+
+        # Copy so the delta is not written into the dict held by the result cache
+        delta = await asyncio.to_thread(store.compare, self.name, target, result.get("findings", []))
+        result = {**result, "delta": delta}
+        if self.surface_dependent and surface is not None:
+            await asyncio.to_thread(store.set_surface, self.name, target, surface)
+        return result
+
+    async def execute_command_stream(
+        self,
+        command: List[str],
+        buffer_limit: int = STREAM_BUFFER_LIMIT,
+        stderr_tail: Optional[Deque[str]] = None,
+        exit_status: Optional[Dict] = None,
+        keep_newlines: bool = False
+    ) -> AsyncIterator[str]:
+        """Execute a shell command and yield stdout lines as they are produced
+
+        Stdout is read with a ``buffer_limit`` stream limit; lines longer
+        than that are yielded as consecutive chunks of at most
+        ``buffer_limit`` bytes, the last one without its newline. With
+        ``keep_newlines`` lines keep their line ending instead, so chunks
+        can be concatenated back into the exact output. Stderr is
+        drained in the background and its lines are appended to
+        ``stderr_tail`` when given (pass a ``deque(maxlen=...)`` to bound it).
+        The process is killed if the consumer stops iterating early. Its
+        exit status is stored under ``exit_status["returncode"]`` if given.
+        """
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=buffer_limit
+        )
+        drain = asyncio.create_task(self._drain_stream(process.stderr, stderr_tail))
+        # Incremental, so a character split across chunks is decoded whole
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            # Set while the chunks of an over-long line are being yielded, so
+            # the newline that ends it does not come out as an empty line
+            long_line = False
+            while True:
+                try:
+                    line = await process.stdout.readuntil(b"\n")
+                except asyncio.IncompleteReadError as e:
+                    text = decoder.decode(e.partial, final=True)
+                    if text:
+                        yield text
+                    break
+                except asyncio.LimitOverrunError as e:
+                    chunk = await process.stdout.read(min(e.consumed, buffer_limit))
+                    long_line = True
+                    yield decoder.decode(chunk)
+                    continue
+                text = decoder.decode(line)
+                if not keep_newlines:
+                    text = text.rstrip("\r\n")
+                if text or not long_line:
+                    yield text
+                long_line = False
+            await process.wait()
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            await drain
+            if exit_status is not None:
+                exit_status["returncode"] = process.returncode
+
+    async def _drain_stream(self, stream: asyncio.StreamReader, sink: Optional[Deque[str]]):
+        """Read a stream to EOF, keeping decoded lines in ``sink`` if given"""
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                line = await stream.read(STREAM_BUFFER_LIMIT)
+            if not line:
+                return
+            if sink is not None:
+                sink.append(line.decode(errors="replace").rstrip("\r\n"))
 
 class ToolOrchestrator:
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        tool_limits: Optional[Dict[str, int]] = None,
+        scan_options: Optional[Dict[str, Dict]] = None,
+        timeout: Optional[float] = None
+    ):
         self.tools: Dict[str, SecurityTool] = {}
+        self.max_concurrency = max_concurrency
+        self.tool_limits = tool_limits or {}
+        # Extra keyword arguments for each tool's scan(), by tool name
+        self.scan_options = scan_options or {}
+        # Seconds a single tool run may take before it is cancelled
+        self.timeout = timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tool_semaphores: Dict[str, asyncio.Semaphore] = {}
 
     def register_tool(self, tool: SecurityTool):
         """Register a security tool with the orchestrator"""
@@ -51,18 +285,177 @@ class ToolOrchestrator:
             setup_results[name] = await tool.setup()
         return setup_results
 
-    async def scan_target(self, target: str) -> List[Dict]:
-        """Run all registered tools against a target"""
+    async def close(self):
+        """Close every registered tool"""
+        await asyncio.gather(*(tool.close() for tool in self.tools.values()), return_exceptions=True)
+
+    async def scan_target(self, target: str, concurrent: bool = False) -> List[Dict]:
+        """Run all registered tools against a target
+
+        With ``concurrent`` set, tools run in parallel bounded by
+        ``max_concurrency`` and the per-tool ``tool_limits``. Results are
+        returned in tool registration order either way.
+        """
+        if concurrent:
+            return list(await asyncio.gather(*(
+                self._run_limited(tool, target) for tool in self.tools.values()
+            )))
+
         results = []
         for tool in self.tools.values():
-            try:
-                result = await tool.scan(target)
-                results.append(result)
-            except Exception as e:
-                results.append({
-                    "tool": tool.name,
-                    "target": target,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "error": str(e)
-                })
+            results.append(await self._run_tool(tool, target))
         return results
+
+    async def scan_target_delta(self, target: str, store: DeltaStore) -> List[Dict]:
+        """Run all registered tools in delta mode against a target
+
+        Tools that are not ``surface_dependent`` run first; the attack surface
+        they report decides whether surface-dependent tools such as nuclei
+        need to run again. Results are returned in tool registration order.
+        """
+        independent = [tool for tool in self.tools.values() if not tool.surface_dependent]
+        dependent = [tool for tool in self.tools.values() if tool.surface_dependent]
+
+        results = dict(zip(
+            (tool.name for tool in independent),
+            await asyncio.gather(*(self._run_limited(tool, target, store) for tool in independent))
+        ))
+
+        surfaces = sorted(filter(None, (
+            tool.attack_surface(results[tool.name])
+            for tool in independent if not results[tool.name].get("error")
+        )))
+        surface = fingerprint_finding({"surfaces": surfaces}) if surfaces else None
+
+        results.update(zip(
+            (tool.name for tool in dependent),
+            await asyncio.gather(*(self._run_limited(tool, target, store, surface) for tool in dependent))
+        ))
+        return [results[name] for name in self.tools]
+
+    async def run_concurrent_scans(self, targets: Iterable[str], workers: int = 16) -> AsyncIterator[Dict]:
+        """Scan many targets with a fixed-size worker pool
+
+        Every (target, tool) pair is a separate work item. Results are
+        yielded as soon as each item finishes, so completion order is not
+        input order; each result carries its ``tool`` and ``target``.
+        The pool size replaces ``max_concurrency``; ``tool_limits`` still apply.
+        """
+        work: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+        results: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+        tools = list(self.tools.values())
+
+        async def stop_workers():
+            for _ in range(workers):
+                await work.put(None)
+
+        async def produce():
+            # Sentinels are only sent while the workers are still draining
+            # the queue; on cancellation the workers are cancelled too, and a
+            # blocking put into the full queue would never return
+            try:
+                for target in targets:
+                    for tool in tools:
+                        await work.put((target, tool))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await stop_workers()
+                raise
+            await stop_workers()
+
+        async def consume():
+            while True:
+                item = await work.get()
+                if item is None:
+                    await results.put(None)
+                    return
+                target, tool = item
+                async with self._tool_semaphore(tool.name):
+                    result = await self._run_tool(tool, target)
+                await results.put(result)
+
+        tasks = [asyncio.create_task(produce())]
+        tasks.extend(asyncio.create_task(consume()) for _ in range(workers))
+        try:
+            remaining = workers
+            while remaining:
+                result = await results.get()
+                if result is None:
+                    remaining -= 1
+                else:
+                    yield result
+            await tasks[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_limited(
+        self,
+        tool: SecurityTool,
+        target: str,
+        delta_store: Optional[DeltaStore] = None,
+        surface: Optional[str] = None
+    ) -> Dict:
+        """Run a tool once a global and a per-tool slot are both free"""
+        async with self._tool_semaphore(tool.name):
+            async with self._global_semaphore():
+                return await self._run_tool(tool, target, delta_store, surface)
+
+    async def _run_tool(
+        self,
+        tool: SecurityTool,
+        target: str,
+        delta_store: Optional[DeltaStore] = None,
+        surface: Optional[str] = None
+    ) -> Dict:
+        """Run a single tool, turning any failure or timeout into an error result"""
+        options = self.scan_options.get(tool.name, {})
+        try:
+            if delta_store is not None:
+                run = tool.scan_delta(target, delta_store, surface, **options)
+            else:
+                run = tool.scan(target, **options)
+            return await asyncio.wait_for(run, self.timeout)
+        except asyncio.TimeoutError:
+            return {
+                "tool": tool.name,
+                "target": target,
+                "timestamp": datetime.utcnow().isoformat(),
+                "error": f"Timed out after {self.timeout:g}s"
+            }
+        except Exception as e:
+            return {
+                "tool": tool.name,
+                "target": target,
+                "timestamp": datetime.utcnow().isoformat(),
+                "error": str(e)
+            }
+
+    def _global_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        return self._semaphore
+
+    def _tool_semaphore(self, name: str) -> asyncio.Semaphore:
+        if name not in self._tool_semaphores:
+            limit = self.tool_limits.get(name, self.max_concurrency)
+            self._tool_semaphores[name] = asyncio.Semaphore(max(1, limit))
+        return self._tool_semaphores[name]
+
+def parse_version(output: str) -> str:
+    """Pick the version line out of a version command's output
+
+    A ``Version:`` line (``pip show``) wins, then the first line holding a
+    dotted version number (tables such as ``nikto -Version``), then the
+    first non-empty line.
+    """
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    for line in lines:
+        if line.lower().startswith("version:"):
+            return line.split(":", 1)[1].strip()
+    for line in lines:
+        if VERSION_PATTERN.search(line):
+            return line
+    return lines[0] if lines else ""
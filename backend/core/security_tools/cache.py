@@ -0,0 +1,128 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from urllib.parse import urlsplit
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Default time-to-live in seconds for cached results, per tool name
+DEFAULT_TTLS = {
+    "nmap": 6 * 3600,
+    "nuclei": 3600,
+    "recon": 12 * 3600,
+    "web": 3600,
+    "dependency": 6 * 3600,
+    "mobile": 24 * 3600,
+    "mobsf": 7 * 24 * 3600,
+    "smart_contract": 24 * 3600,
+    "mythril": 24 * 3600
+}
+
+# Directories left out when fingerprinting a directory target
+SKIPPED_DIRS = {".git", ".hg", ".svn"}
+
+# Bytes read per step when hashing a file
+HASH_CHUNK_SIZE = 1024 * 1024
+
+class ResultCache:
+    """Size-bounded LRU cache of scan results with per-tool TTLs"""
+
+    def __init__(self, max_entries: int = 1024, default_ttl: int = 3600, ttls: Optional[Dict[str, int]] = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(tool: str, target: str, args: List, version: str) -> str:
+        """Build a cache key from tool name, normalized target, arguments and tool version"""
+        payload = json.dumps([tool, normalize_target(target), args, version], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def ttl_for(self, tool: str) -> int:
+        return self.ttls.get(tool, self.default_ttl)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a live entry and mark it most recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: Any, ttl: Optional[int] = None):
+        """Store an entry, evicting least recently used ones past ``max_entries``"""
+        expires = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def normalize_target(target: str) -> str:
+    """Canonicalize a scan target for use in cache keys
+
+    URLs and hostnames are case-folded, and trailing slashes and dots are
+    dropped. Local files also get their size and mtime, and directories a
+    digest of every file below them, so edited sources miss the cache.
+    """
+    target = target.strip()
+    parts = urlsplit(target)
+    if parts.scheme and parts.netloc:
+        path = parts.path.rstrip("/")
+        query = f"?{parts.query}" if parts.query else ""
+        return f"{parts.scheme.lower()}://{parts.netloc.lower()}{path}{query}"
+
+    if os.path.isdir(target):
+        return f"{os.path.abspath(target)}@{tree_digest(target)}"
+
+    if os.path.exists(target):
+        stat = os.stat(target)
+        return f"{os.path.abspath(target)}@{stat.st_mtime_ns}:{stat.st_size}"
+
+    return target.lower().rstrip(".")
+
+def tree_digest(directory: str) -> str:
+    """SHA-256 over the relative path and contents of every file in a directory"""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in SKIPPED_DIRS)
+        for file in sorted(files):
+            path = os.path.join(root, file)
+            if not os.path.isfile(path):
+                continue
+            digest.update(os.path.relpath(path, directory).encode() + b"\0")
+            digest.update(hash_file(path).encode() + b"\0")
+    return digest.hexdigest()
+
+def hash_file(path: str, algorithm: str = "sha256") -> str:
+    """Hex digest of a file, read in fixed-size chunks"""
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Process-wide cache shared by tools that are not given their own
+default_result_cache = ResultCache()
@@ -0,0 +1,237 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from .cache import hash_file
+
+IMPORT_PATTERN = re.compile(r"""import\s+(?:[^'";]*?\bfrom\s+)?["']([^"']+)["']""")
+
+# Directories that never hold sources worth keying on
+SKIPPED_DIRS = {".git", "crytic-export", "artifacts", "cache", "out", "build"}
+
+# Project files whose contents change how sources are compiled
+PROJECT_FILES = ("hardhat.config.js", "hardhat.config.ts", "truffle-config.js", "foundry.toml", "remappings.txt")
+
+# Name of the crytic-compile standard export inside an artifact directory;
+# crytic-compile only recognises exports whose name ends in ``_export.json``
+EXPORT_NAME = "crytic_export.json"
+
+class CompilationCache:
+    """Compile-once store of crytic-compile artifacts shared by contract scanners
+
+    Artifacts are keyed by a hash of the target's Solidity sources, the
+    compiler version and the compile settings, and kept on disk under
+    ``root``. Slither and Manticore read the exported project directly;
+    Mythril can analyse the runtime bytecode it contains.
+    """
+
+    def __init__(self, root: str = "compile_artifacts", solc: str = "solc"):
+        self.root = root
+        self.solc = solc
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._compiler_version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+    async def compile(self, target: str, solc_args: str = "", solc_remaps: str = "") -> Dict:
+        """Return ``{"key", "path", "cached"}`` for the exported artifacts of ``target``
+
+        Concurrent requests for the same key in this process wait for a
+        single compilation. Raises ``RuntimeError`` if compilation fails.
+        """
+        target = os.path.abspath(target)
+        version = await self.compiler_version()
+        sources = await asyncio.to_thread(source_digests, target)
+        key = hashlib.sha256(json.dumps(
+            [sorted(sources.items()), version, solc_args, solc_remaps]
+        ).encode()).hexdigest()
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            path = os.path.join(self.root, key, EXPORT_NAME)
+            if await asyncio.to_thread(self._is_valid, key):
+                self.hits += 1
+                return {"key": key, "path": path, "cached": True}
+
+            self.misses += 1
+            await self._build(target, key, sources, solc_args, solc_remaps)
+            return {"key": key, "path": path, "cached": False}
+
+    async def compiler_version(self) -> str:
+        """First version line printed by ``solc --version``, memoized"""
+        if self._compiler_version is None:
+            try:
+                stdout, _ = await _run([self.solc, "--version"])
+                lines = [line for line in stdout.splitlines() if line.startswith("Version:")]
+                self._compiler_version = lines[0] if lines else stdout.strip()
+            except OSError:
+                self._compiler_version = ""
+        return self._compiler_version
+
+    def runtime_bytecodes(self, export_path: str, target: Optional[str] = None) -> Dict[str, str]:
+        """Map ``source:Contract`` to deployed bytecode for every non-dependency contract
+
+        With ``target``, only contracts defined in that file (or, for a
+        directory, in files below it) are returned, not ones from the
+        local files it imports.
+        """
+        with open(export_path) as f:
+            export = json.load(f)
+        if target is not None:
+            target = os.path.realpath(target)
+            base = target if os.path.isdir(target) else os.path.dirname(target)
+        bytecodes = {}
+        for unit in export.get("compilation_units", {}).values():
+            for source, source_unit in unit.get("source_units", {}).items():
+                if target is not None and not _in_target(_source_paths(source, source_unit, base), target):
+                    continue
+                for name, contract in source_unit.get("contracts", {}).items():
+                    if contract.get("bin-runtime") and not contract.get("is_dependency"):
+                        bytecodes[f"{source}:{name}"] = contract["bin-runtime"]
+        return bytecodes
+
+    def _is_valid(self, key: str) -> bool:
+        """An entry is usable while it exists and its source files are still in place
+
+        Tools reopen the sources listed in the export for source mappings.
+        """
+        meta_path = os.path.join(self.root, key, "meta.json")
+        if not os.path.exists(meta_path):
+            return False
+        with open(meta_path) as f:
+            meta = json.load(f)
+        return all(os.path.exists(path) for path in meta.get("sources", []))
+
+    async def _build(self, target: str, key: str, sources: Dict[str, str], solc_args: str, solc_remaps: str):
+        os.makedirs(self.root, exist_ok=True)
+        build_dir = tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=self.root)
+        try:
+            command = ["crytic-compile", target, "--export-format", "standard", "--export-dir", build_dir]
+            if solc_args:
+                command.extend(["--solc-args", solc_args])
+            if solc_remaps:
+                command.extend(["--solc-remaps", solc_remaps])
+            stdout, stderr = await _run(command, cwd=target if os.path.isdir(target) else os.path.dirname(target))
+
+            exports = [name for name in os.listdir(build_dir) if name.endswith(".json")]
+            if not exports:
+                raise RuntimeError(f"Compilation of {target} failed: {stderr.strip() or stdout.strip()}")
+            os.replace(os.path.join(build_dir, exports[0]), os.path.join(build_dir, EXPORT_NAME))
+            with open(os.path.join(build_dir, "meta.json"), "w") as f:
+                json.dump({
+                    "target": target,
+                    "sources": sorted(path for path in sources if not path.startswith("import:"))
+                }, f)
+
+            final_dir = os.path.join(self.root, key)
+            if os.path.exists(final_dir):
+                shutil.rmtree(final_dir, ignore_errors=True)
+            try:
+                os.replace(build_dir, final_dir)
+            except OSError:
+                # Another process published the same key first
+                pass
+        finally:
+            if os.path.exists(build_dir):
+                shutil.rmtree(build_dir, ignore_errors=True)
+
+def source_digests(target: str) -> Dict[str, str]:
+    """SHA-256 of every source that can affect compiling ``target``
+
+    A directory contributes all its ``.sol`` files and project config files;
+    a single file contributes itself and the files it imports, followed
+    transitively. Imports that cannot be resolved are keyed by name.
+    """
+    digests: Dict[str, str] = {}
+    if os.path.isdir(target):
+        for root, dirs, files in os.walk(target):
+            dirs[:] = sorted(d for d in dirs if d not in SKIPPED_DIRS)
+            for file in files:
+                if file.endswith(".sol") or (root == target and file in PROJECT_FILES):
+                    path = os.path.join(root, file)
+                    digests[path] = hash_file(path)
+        return digests
+
+    pending = [target]
+    while pending:
+        path = pending.pop()
+        if path in digests:
+            continue
+        digests[path] = hash_file(path)
+        with open(path, encoding="utf8", errors="replace") as f:
+            for imported in IMPORT_PATTERN.findall(f.read()):
+                resolved = _resolve_import(path, imported)
+                if resolved is None:
+                    digests["import:" + imported] = ""
+                elif resolved not in digests:
+                    pending.append(resolved)
+    return digests
+
+def _resolve_import(importer: str, imported: str) -> Optional[str]:
+    base = os.path.dirname(importer)
+    if imported.startswith("."):
+        candidates: Iterable[str] = [os.path.join(base, imported)]
+    else:
+        candidates = []
+        directory = base
+        while True:
+            candidates.extend([
+                os.path.join(directory, imported),
+                os.path.join(directory, "node_modules", imported),
+                os.path.join(directory, "lib", imported)
+            ])
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                break
+            directory = parent
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return os.path.normpath(candidate)
+    return None
+
+def _source_paths(source: str, source_unit: Dict, base: str) -> List[str]:
+    """Real paths a standard-export source unit may refer to
+
+    Relative names are resolved against ``base``, the directory
+    crytic-compile was run from.
+    """
+    names = [source, *source_unit.get("filenames", {}).values()]
+    return [os.path.realpath(os.path.join(base, name)) for name in names if isinstance(name, str) and name]
+
+def _in_target(paths: List[str], target: str) -> bool:
+    for path in paths:
+        if path == target or path.startswith(target + os.sep):
+            return True
+    return False
+
+async def _run(command: List[str], cwd: Optional[str] = None) -> Tuple[str, str]:
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        cwd=cwd or None,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    return stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+async def compiled_target(cache: Optional[CompilationCache], target: str, solc_args: str = "", solc_remaps: str = "") -> str:
+    """Path of the shared compiled artifacts for ``target``
+
+    Falls back to ``target`` itself, which the tool then compiles on its
+    own, when there is no cache, the target is not Solidity or compiling
+    fails.
+    """
+    if cache is None or not (os.path.isdir(target) or target.endswith(".sol")):
+        return target
+    try:
+        return (await cache.compile(target, solc_args, solc_remaps))["path"]
+    except (OSError, RuntimeError) as e:
+        print(f"Shared compilation of {target} failed, falling back to per-tool compilation: {e}")
+        return target
+
+# Process-wide cache shared by scanners that are not given their own
+default_compilation_cache = CompilationCache()
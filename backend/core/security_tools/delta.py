@@ -0,0 +1,104 @@
+from typing import Dict, Iterable, List, Optional
+import hashlib
+import json
+import sqlite3
+import threading
+
+# Finding keys that change between runs without the finding itself changing
+VOLATILE_KEYS = {"timestamp", "cached", "new"}
+
+def fingerprint_finding(finding: Dict) -> str:
+    """Stable content hash of a finding, ignoring volatile keys"""
+    payload = json.dumps(_strip_volatile(finding), sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+def _strip_volatile(value):
+    if isinstance(value, dict):
+        return {k: _strip_volatile(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_strip_volatile(v) for v in value]
+    return value
+
+class DeltaStore:
+    """Latest findings and attack-surface fingerprints per (tool, target)
+
+    Only the most recent run is kept, so storage grows with the number of
+    live findings rather than the number of runs.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS findings (
+                tool TEXT NOT NULL,
+                target TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                finding TEXT NOT NULL,
+                PRIMARY KEY (tool, target, fingerprint)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS surfaces (
+                tool TEXT NOT NULL,
+                target TEXT NOT NULL,
+                surface TEXT NOT NULL,
+                PRIMARY KEY (tool, target)
+            ) WITHOUT ROWID;
+        """)
+
+    def previous(self, tool: str, target: str) -> List[Dict]:
+        """Return the findings stored for the last run of ``tool`` on ``target``"""
+        rows = self._conn.execute(
+            "SELECT finding FROM findings WHERE tool = ? AND target = ? ORDER BY fingerprint",
+            (tool, target)
+        )
+        return [json.loads(finding) for (finding,) in rows]
+
+    def compare(self, tool: str, target: str, findings: Iterable[Dict]) -> Dict[str, List[Dict]]:
+        """Diff ``findings`` against the previous run and store them as the new baseline
+
+        Returns ``new``, ``resolved`` and ``unchanged`` finding lists.
+        """
+        current: Dict[str, Dict] = {}
+        for finding in findings:
+            current.setdefault(fingerprint_finding(finding), finding)
+
+        with self._lock, self._conn:
+            previous = dict(self._conn.execute(
+                "SELECT fingerprint, finding FROM findings WHERE tool = ? AND target = ?",
+                (tool, target)
+            ))
+            new = [fp for fp in current if fp not in previous]
+            resolved = [fp for fp in previous if fp not in current]
+
+            self._conn.executemany(
+                "DELETE FROM findings WHERE tool = ? AND target = ? AND fingerprint = ?",
+                [(tool, target, fp) for fp in resolved]
+            )
+            self._conn.executemany(
+                "INSERT INTO findings (tool, target, fingerprint, finding) VALUES (?, ?, ?, ?)",
+                [(tool, target, fp, json.dumps(current[fp], default=str)) for fp in new]
+            )
+
+        return {
+            "new": [current[fp] for fp in new],
+            "resolved": [json.loads(previous[fp]) for fp in resolved],
+            "unchanged": [finding for fp, finding in current.items() if fp in previous]
+        }
+
+    def get_surface(self, tool: str, target: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT surface FROM surfaces WHERE tool = ? AND target = ?", (tool, target)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_surface(self, tool: str, target: str, surface: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO surfaces (tool, target, surface) VALUES (?, ?, ?)",
+                (tool, target, surface)
+            )
+
+    def close(self):
+        self._conn.close()
@@ -4,7 +4,19 @@ import json
 from ..base import SecurityTool
 from datetime import datetime
 
+# Exit statuses that mean the scan completed: snyk exits 1 when it found
+# vulnerabilities, the WhiteSource agent -2 (254) on policy violations
+SUCCESS_EXIT_CODES = {
+    "snyk": (0, 1),
+    "whitesource": (0, 254)
+}
+
 class DependencyScanner(SecurityTool):
+    version_commands = {
+        "snyk": ["snyk", "--version"],
+        "whitesource": ["java", "-jar", "/usr/local/bin/wss-unified-agent.jar", "-v"]
+    }
+
     def __init__(self, config: Dict):
         super().__init__("dependency", config)
         self.snyk_token = config.get("snyk_token", "")
@@ -37,8 +49,7 @@ class DependencyScanner(SecurityTool):
             print(f"Failed to setup dependency scanning tools: {e}")
             return False
 
-    async def scan(self, target: str, tool: str = None) -> Dict:
-        """Run dependency security scan with specified tool"""
+    async def _run_scan(self, target: str, tool: str = None) -> Dict:
         results = {
             "tool": self.name,
             "target": target,
@@ -46,20 +57,28 @@ class DependencyScanner(SecurityTool):
             "findings": []
         }
 
+        command = None
         if tool == "snyk":
             os.environ["SNYK_TOKEN"] = self.snyk_token
-            stdout, stderr = await self.execute_command(["snyk", "test", "--json", target])
+            command = ["snyk", "test", "--json", target]
+            stdout, stderr, returncode = await self.execute_command_status(command)
             results["findings"].extend(self.parse_snyk_output(stdout))
         elif tool == "whitesource":
             config_file = self.create_whitesource_config(target)
-            stdout, stderr = await self.execute_command([
+            command = [
                 "java", "-jar", "/usr/local/bin/wss-unified-agent.jar",
                 "-c", config_file,
                 "-apiKey", self.whitesource_key,
                 "-d", target
-            ])
+            ]
+            stdout, stderr, returncode = await self.execute_command_status(command)
             results["findings"].extend(self.parse_whitesource_output(stdout))
 
+        if command is not None:
+            error = self.command_error(command, returncode, stderr, SUCCESS_EXIT_CODES.get(tool, (0,)))
+            if error:
+                results["error"] = error
+
         return results
 
     def parse_snyk_output(self, output: str) -> List[Dict]:
@@ -0,0 +1,317 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from collections import OrderedDict
+from urllib.parse import urljoin, urlsplit
+import hashlib
+import json
+import re
+import threading
+
+IDENTIFIER_PATTERN = re.compile(r"\b(CVE-\d{4}-\d{4,}|CWE-\d+|SWC-\d+)\b", re.IGNORECASE)
+
+# Nmap target specs that cover several hosts: CIDR, lists, wildcards, octet ranges
+MULTI_HOST_TARGET = re.compile(r"[/,\s*]|^[\d.]*\d-\d[\d.\-]*$")
+
+# Identifier families in the order they are preferred as a finding's issue key
+IDENTIFIER_PRIORITY = ("CVE", "SWC", "CWE")
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+SEVERITY_ALIASES = {"informational": "info", "information": "info", "moderate": "medium", "warning": "medium", "error": "high"}
+
+# Slither detectors that correspond to an SWC registry entry
+SLITHER_SWC = {
+    "reentrancy-eth": "SWC-107",
+    "reentrancy-no-eth": "SWC-107",
+    "reentrancy-benign": "SWC-107",
+    "suicidal": "SWC-106",
+    "arbitrary-send-eth": "SWC-105",
+    "unchecked-lowlevel": "SWC-104",
+    "unchecked-send": "SWC-104",
+    "controlled-delegatecall": "SWC-112",
+    "uninitialized-storage": "SWC-109",
+    "tx-origin": "SWC-115",
+    "timestamp": "SWC-116",
+    "weak-prng": "SWC-120",
+    "shadowing-state": "SWC-119",
+    "incorrect-equality": "SWC-132"
+}
+
+# Finding keys that may carry a title, in order of preference
+TITLE_KEYS = ("title", "template_name", "name", "rule", "check", "message", "template_id", "detail", "finding", "port")
+
+def normalize_result(result: Dict) -> List[Dict]:
+    """Map every finding of a scan result to common finding records
+
+    A record has ``title``, ``description``, ``severity``, ``cwe_id``,
+    ``identifiers`` (CVE/SWC/CWE/tool ids), ``location``, ``tools``,
+    ``target``, ``fingerprint``, ``timestamp`` and the original finding as
+    ``raw``.
+    """
+    if result.get("error"):
+        return []
+
+    tool = result.get("tool", "")
+    target = result.get("target") or result.get("provider") or ""
+    mapper = MAPPERS.get(tool, _map_generic)
+
+    records = []
+    for finding in result.get("findings", []):
+        for record in mapper(finding, target):
+            records.append(_finish(record, tool, target, finding, result.get("timestamp")))
+    return records
+
+def fingerprint(issue_key: str, location: str) -> str:
+    """Content fingerprint shared by every report of the same issue at the same place"""
+    return hashlib.sha256(json.dumps([issue_key, location]).encode()).hexdigest()
+
+def _finish(record: Dict, tool: str, target: str, finding: Dict, timestamp: Optional[str]) -> Dict:
+    identifiers = _sort_identifiers(record.get("identifiers", []))
+    title = str(record.get("title") or tool)
+    issue_key = identifiers[0] if identifiers else "title:" + _slug(title)
+    location = record.get("location") or _endpoint(target)
+    severity = str(record.get("severity") or "").lower() or None
+    return {
+        "title": title,
+        "description": record.get("description") or "",
+        "severity": SEVERITY_ALIASES.get(severity, severity),
+        "cwe_id": next((i for i in identifiers if i.startswith("CWE-")), None),
+        "identifiers": identifiers,
+        "location": location,
+        "tools": [tool],
+        "target": target,
+        "fingerprint": fingerprint(issue_key, location),
+        "timestamp": finding.get("timestamp") or timestamp,
+        "raw": finding
+    }
+
+def _map_nuclei(finding: Dict, target: str) -> List[Dict]:
+    classification = finding.get("classification") or {}
+    text = " ".join(filter(None, [finding.get("template_id") or ""] + [
+        " ".join(v) if isinstance(v, list) else str(v or "")
+        for v in (classification.get("cve-id"), classification.get("cwe-id"))
+    ]))
+    identifiers = _extract_identifiers(text)
+    if not identifiers and finding.get("template_id"):
+        identifiers = ["nuclei:" + finding["template_id"]]
+    return [{
+        "title": finding.get("template_name") or finding.get("template_id"),
+        "description": finding.get("description"),
+        "severity": finding.get("severity"),
+        "identifiers": identifiers,
+        "location": _endpoint(finding.get("matched") or target)
+    }]
+
+def _map_nmap(finding: Dict, target: str) -> List[Dict]:
+    # Locate by the name that was scanned, as URL-based tools do, rather
+    # than the address it resolved to
+    host = _single_host(target) or next(iter(finding.get("hostnames") or []), None) or finding.get("host") or target
+    location = f"{host.lower()}:{str(finding.get('port', '')).split('/')[0]}"
+    records = []
+    for vuln in finding.get("vulnerabilities", []):
+        identifiers = _extract_identifiers(vuln.get("description", ""))
+        records.append({
+            "title": vuln.get("script_id") or "nmap script finding",
+            "description": vuln.get("description"),
+            "identifiers": identifiers or ["nmap:" + str(vuln.get("script_id"))],
+            "location": location
+        })
+    return records
+
+def _map_web(finding: Dict, target: str) -> List[Dict]:
+    if "rule" in finding:  # semgrep
+        return [{
+            "title": finding.get("rule"),
+            "description": finding.get("message"),
+            "identifiers": _extract_identifiers(finding.get("message") or "") or ["semgrep:" + str(finding.get("rule"))],
+            "location": f"{finding.get('path')}:{finding.get('line')}"
+        }]
+    if "url" in finding:  # nikto reports paths relative to the target
+        location = _endpoint(_resolve_url(target, finding.get("url")))
+        if finding.get("port"):
+            location = f"{location.split(':')[0]}:{finding['port']}"
+        return [{
+            "title": finding.get("message"),
+            "description": finding.get("message"),
+            "identifiers": _extract_identifiers(finding.get("message") or "") or ["nikto:" + str(finding.get("id"))],
+            "location": location
+        }]
+    if "port" in finding:  # masscan open ports are inventory, not issues
+        return []
+    return _map_generic(finding, target)
+
+def _map_contract(finding: Dict, target: str) -> List[Dict]:
+    """Mythril and Slither report against a contract function"""
+    swc_id = finding.get("swc_id")
+    identifiers = [f"SWC-{swc_id}"] if swc_id else []
+    if finding.get("check") in SLITHER_SWC:
+        identifiers.append(SLITHER_SWC[finding["check"]])
+    if not identifiers:
+        identifiers = _extract_identifiers(finding.get("description") or "")
+    function = str(finding.get("function") or "").split("(")[0]
+    return [{
+        "title": finding.get("title") or finding.get("check") or finding.get("detail"),
+        "description": finding.get("description") or finding.get("detail"),
+        "identifiers": identifiers,
+        "location": ":".join([target, str(finding.get("contract") or ""), function])
+    }]
+
+def _map_mobsf(finding: Dict, target: str) -> List[Dict]:
+    if finding.get("type") == "permissions":
+        return []
+    location = target
+    if finding.get("file"):
+        location = f"{target}:{finding['file']}:{finding.get('line', 0)}"
+    return [{
+        "title": finding.get("name"),
+        "description": finding.get("description"),
+        "identifiers": _extract_identifiers(" ".join([finding.get("name") or "", finding.get("description") or ""])),
+        "location": location
+    }]
+
+def _map_dependency(finding: Dict, target: str) -> List[Dict]:
+    return [{
+        "title": finding.get("title") or finding.get("detail"),
+        "description": finding.get("description"),
+        "identifiers": _extract_identifiers(" ".join(str(v) for v in finding.values() if v)),
+        "location": f"{target}:{finding.get('package') or ''}@{finding.get('version') or ''}"
+    }]
+
+def _map_generic(finding: Dict, target: str) -> List[Dict]:
+    title = next((finding[key] for key in TITLE_KEYS if finding.get(key)), None)
+    return [{
+        "title": title,
+        "description": finding.get("description") or finding.get("message"),
+        "severity": finding.get("severity"),
+        "identifiers": _extract_identifiers(json.dumps(finding, default=str))
+    }]
+
+def _map_none(finding: Dict, target: str) -> List[Dict]:
+    return []
+
+MAPPERS: Dict[str, Callable[[Dict, str], List[Dict]]] = {
+    "nuclei": _map_nuclei,
+    "nmap": _map_nmap,
+    "web": _map_web,
+    "mythril": _map_contract,
+    "smart_contract": _map_contract,
+    "mobsf": _map_mobsf,
+    "dependency": _map_dependency,
+    "recon": _map_none
+}
+
+def _extract_identifiers(text: str) -> List[str]:
+    return list(dict.fromkeys(match.upper() for match in IDENTIFIER_PATTERN.findall(text)))
+
+def _sort_identifiers(identifiers: Iterable[str]) -> List[str]:
+    def rank(identifier: str) -> int:
+        family = identifier.split("-")[0].upper()
+        return IDENTIFIER_PRIORITY.index(family) if family in IDENTIFIER_PRIORITY else len(IDENTIFIER_PRIORITY)
+    return sorted(dict.fromkeys(identifiers), key=lambda i: (rank(i), i))
+
+def _endpoint(value: str) -> str:
+    """Reduce a URL or host[:port] to a lower-cased ``host:port``"""
+    value = (value or "").strip()
+    if "://" in value:
+        parts = urlsplit(value)
+        host = (parts.hostname or "").lower()
+        port = str(parts.port) if parts.port else DEFAULT_PORTS.get(parts.scheme.lower(), "")
+        return f"{host}:{port}" if port else host
+    return value.lower().rstrip("/")
+
+def _single_host(target: str) -> Optional[str]:
+    """Host name of a target naming exactly one host, else None"""
+    target = (target or "").strip()
+    if "://" in target:
+        return urlsplit(target).hostname
+    if not target or MULTI_HOST_TARGET.search(target):
+        return None
+    return target.rstrip(".")
+
+def _resolve_url(target: str, url: Optional[str]) -> str:
+    """Absolute URL for a path reported relative to the scanned target"""
+    if not url:
+        return target
+    if "://" in url:
+        return url
+    base = target if "://" in target else f"http://{target}"
+    return urljoin(base, url)
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+class FindingDeduplicator:
+    """Bounded in-memory fingerprint index used to collapse duplicate findings
+
+    Maps fingerprints to the tools that reported them. Fingerprints not in
+    memory are resolved in bulk through ``lookup`` (typically a database
+    query), so the index is a cache in front of durable storage. Results of
+    ``add_many`` only enter the index once passed to ``remember_many``, i.e.
+    after they were stored; hold ``lock`` across both to serialize writers.
+    """
+
+    def __init__(self, max_entries: int = 1_000_000):
+        self.max_entries = max_entries
+        self._index: "OrderedDict[str, List[str]]" = OrderedDict()
+        self.lock = threading.RLock()
+
+    def add_many(
+        self,
+        records: Iterable[Dict],
+        lookup: Optional[Callable[[List[str]], Dict[str, List[str]]]] = None
+    ) -> Tuple[List[Dict], Dict[str, List[str]]]:
+        """Split records into ones never seen before and merges into known ones
+
+        Returns the new records (duplicates within the batch folded into the
+        first occurrence) and, for already-known fingerprints that gained a
+        tool, the updated tool list.
+        """
+        records = list(records)
+        with self.lock:
+            if lookup is not None:
+                missing = list({r["fingerprint"] for r in records if r["fingerprint"] not in self._index})
+                if missing:
+                    for fp, tools in lookup(missing).items():
+                        self._remember(fp, list(tools))
+
+            new: Dict[str, Dict] = {}
+            merged: Dict[str, List[str]] = {}
+            for record in records:
+                fp = record["fingerprint"]
+                if fp in new:
+                    _add_tools(new[fp]["tools"], record["tools"])
+                elif fp in self._index:
+                    tools = merged.get(fp) or list(self._index[fp])
+                    if _add_tools(tools, record["tools"]):
+                        merged[fp] = tools
+                    self._index.move_to_end(fp)
+                else:
+                    new[fp] = {**record, "tools": list(record["tools"])}
+            return list(new.values()), merged
+
+    def remember_many(self, new: Iterable[Dict], merged: Dict[str, List[str]]):
+        """Record the output of ``add_many`` once it has been stored"""
+        with self.lock:
+            for record in new:
+                self._remember(record["fingerprint"], list(record["tools"]))
+            for fp, tools in merged.items():
+                self._remember(fp, list(tools))
+
+    def __contains__(self, fp: str) -> bool:
+        return fp in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _remember(self, fp: str, tools: List[str]):
+        self._index[fp] = tools
+        self._index.move_to_end(fp)
+        while len(self._index) > self.max_entries:
+            self._index.popitem(last=False)
+
+def _add_tools(tools: List[str], extra: Iterable[str]) -> bool:
+    added = False
+    for tool in extra:
+        if tool not in tools:
+            tools.append(tool)
+            added = True
+    return added
@@ -5,6 +5,10 @@ from ..base import SecurityTool
 from datetime import datetime
 
 class MobileScanner(SecurityTool):
+    version_commands = {
+        "apkleaks": ["pip3", "show", "apkleaks"]
+    }
+
     def __init__(self, config: Dict):
         super().__init__("mobile", config)
 
@@ -28,8 +32,7 @@ class MobileScanner(SecurityTool):
             print(f"Failed to setup mobile security tools: {e}")
             return False
 
-    async def scan(self, target: str, tool: str = None) -> Dict:
-        """Run mobile security scan with specified tool"""
+    async def _run_scan(self, target: str, tool: str = None) -> Dict:
         results = {
             "tool": self.name,
             "target": target,
@@ -38,8 +41,12 @@ class MobileScanner(SecurityTool):
         }
 
         if tool == "apkleaks":
-            stdout, stderr = await self.execute_command(["apkleaks", "-f", target])
+            command = ["apkleaks", "-f", target]
+            stdout, stderr, returncode = await self.execute_command_status(command)
             results["findings"].extend(self.parse_apkleaks_output(stdout))
+            error = self.command_error(command, returncode, stderr)
+            if error:
+                results["error"] = error
         elif tool == "frida":
             # Frida requires a running process, handled separately
             pass
@@ -1,8 +1,10 @@
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
+import asyncio
 import json
 import os
 import aiohttp
 from ..base import SecurityTool
+from ..cache import hash_file
 from datetime import datetime
 
 class MobSFScanner(SecurityTool):
@@ -11,6 +13,10 @@ class MobSFScanner(SecurityTool):
         self.api_key = config.get("api_key", "")
         self.host = config.get("host", "http://localhost:8000")
         self.headers = {"Authorization": self.api_key}
+        self.max_concurrent_scans = config.get("max_concurrent_scans", 4)
+        self.connection_limit = config.get("connection_limit", 10)
+        self.timeout = aiohttp.ClientTimeout(total=config.get("timeout", 1800))
+        self._session: Optional[aiohttp.ClientSession] = None
 
     async def setup(self) -> bool:
         """Install and configure MobSF"""
@@ -51,45 +57,133 @@ class MobSFScanner(SecurityTool):
             print(f"Failed to setup MobSF: {e}")
             return False
 
-    async def scan(self, file_path: str) -> Dict:
-        """Scan mobile application"""
+    async def scan(self, file_path: str, bypass_cache: bool = False) -> Dict:
+        """Scan mobile application
+
+        The file's MD5, which is also the hash MobSF identifies uploads by,
+        is computed locally first. A report found in the local hash index
+        or already held by MobSF is reused without uploading the file.
+        """
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
+        scan_type = self._get_scan_type(file_path)
+
+        file_hash = await asyncio.to_thread(hash_file, file_path, "md5")
+        key = self.cache.make_key(self.name, file_hash, [self.host], "") if self.cache is not None else None
+
+        report = None
+        cached = False
+        if not bypass_cache:
+            if key is not None:
+                report = self.cache.get(key)
+                cached = report is not None
+            if report is None:
+                report = await self._fetch_report(file_hash)
 
-        async with aiohttp.ClientSession() as session:
-            # Upload file
-            upload_url = f"{self.host}/api/v1/upload"
-            with open(file_path, 'rb') as f:
-                files = {'file': f}
-                async with session.post(upload_url, headers=self.headers, data=files) as response:
-                    upload_data = await response.json()
-                    if not upload_data.get("hash"):
-                        raise Exception("Failed to upload file")
+        if report is None:
+            upload_data = await self._upload(file_path)
+            if not upload_data.get("hash"):
+                raise Exception("Failed to upload file")
 
             file_hash = upload_data["hash"]
 
             # Start scan
-            scan_url = f"{self.host}/api/v1/scan"
-            scan_data = {
-                "hash": file_hash,
-                "scan_type": self._get_scan_type(file_path)
-            }
-            async with session.post(scan_url, headers=self.headers, json=scan_data) as response:
-                scan_result = await response.json()
+            await self._post("scan", {"hash": file_hash, "scan_type": scan_type})
 
             # Get report
-            report_url = f"{self.host}/api/v1/report_json"
-            report_data = {"hash": file_hash}
-            async with session.post(report_url, headers=self.headers, json=report_data) as response:
-                report = await response.json()
-
-            return {
-                "tool": self.name,
-                "target": file_path,
-                "timestamp": datetime.utcnow().isoformat(),
-                "findings": await self.parse_results(report),
-                "raw_output": report
-            }
+            report = await self._post("report_json", {"hash": file_hash})
+            if not self._is_report(report):
+                raise Exception(f"MobSF returned no report for {file_hash}: {report}")
+
+        if key is not None and not cached:
+            self.cache.put(key, report, self.cache.ttl_for(self.name))
+
+        result = {
+            "tool": self.name,
+            "target": file_path,
+            "timestamp": datetime.utcnow().isoformat(),
+            "findings": await self.parse_results(report),
+            "raw_output": report
+        }
+        if cached:
+            result["cached"] = True
+        return result
+
+    async def scan_many(self, file_paths: Iterable[str], concurrency: Optional[int] = None) -> List[Dict]:
+        """Scan several applications over the shared session
+
+        At most ``concurrency`` (default ``max_concurrent_scans``) uploads
+        and scans run at once. Results are returned in input order, with
+        failures reported as error results.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency or self.max_concurrent_scans))
+
+        async def run(file_path: str) -> Dict:
+            async with semaphore:
+                try:
+                    return await self.scan(file_path)
+                except Exception as e:
+                    return {
+                        "tool": self.name,
+                        "target": file_path,
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "error": str(e)
+                    }
+
+        return await asyncio.gather(*(run(file_path) for file_path in file_paths))
+
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Long-lived session whose connections are reused across requests"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.connection_limit),
+                timeout=self.timeout
+            )
+        return self._session
+
+    async def _fetch_report(self, file_hash: str) -> Optional[Dict]:
+        """Return MobSF's existing report for ``file_hash``, if it has one"""
+        async with self._get_session().post(
+            f"{self.host}/api/v1/report_json", headers=self.headers, data={"hash": file_hash}
+        ) as response:
+            if response.status != 200:
+                return None
+            report = await response.json(content_type=None)
+        return report if self._is_report(report) else None
+
+    @staticmethod
+    def _is_report(report) -> bool:
+        """Whether a report_json response is a report rather than an error"""
+        return isinstance(report, dict) and "error" not in report and "report" not in report
+
+    async def _upload(self, file_path: str) -> Dict:
+        """Upload a binary as streamed multipart, read from disk in chunks"""
+        with open(file_path, 'rb') as f:
+            form = aiohttp.FormData()
+            form.add_field(
+                "file", f,
+                filename=os.path.basename(file_path),
+                content_type="application/octet-stream"
+            )
+            return await self._post("upload", form)
+
+    async def _post(self, endpoint: str, data) -> Dict:
+        """POST to a MobSF API endpoint, raising if it responds with an error"""
+        async with self._get_session().post(
+            f"{self.host}/api/v1/{endpoint}", headers=self.headers, data=data
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"MobSF {endpoint} failed with HTTP {response.status}: {await response.text()}")
+            body = await response.json(content_type=None)
+        if isinstance(body, dict) and "error" in body:
+            raise Exception(f"MobSF {endpoint} failed: {body['error']}")
+        return body
 
     def _get_scan_type(self, file_path: str) -> str:
         """Determine scan type based on file extension"""
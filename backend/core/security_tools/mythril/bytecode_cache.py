@@ -0,0 +1,49 @@
+from typing import Dict, Optional
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+class BytecodeCache:
+    """Persistent Mythril results for deployed bytecode, keyed by code hash
+
+    Contracts whose runtime code is unchanged, and different addresses that
+    share identical code, resolve to the same entry. The Mythril version and
+    analysis mode are part of the key, so upgrades re-analyse.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS analyses (
+                code_hash TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                analysed_at TEXT NOT NULL,
+                PRIMARY KEY (code_hash, mode, version)
+            ) WITHOUT ROWID
+        """)
+
+    def get(self, code_hash: str, mode: str, version: str) -> Optional[Dict]:
+        row = self._conn.execute(
+            "SELECT result FROM analyses WHERE code_hash = ? AND mode = ? AND version = ?",
+            (code_hash, mode, version)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, code_hash: str, mode: str, version: str, result: Dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses (code_hash, mode, version, result, analysed_at) VALUES (?, ?, ?, ?, ?)",
+                (code_hash, mode, version, json.dumps(result, default=str), datetime.utcnow().isoformat())
+            )
+
+    def close(self):
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
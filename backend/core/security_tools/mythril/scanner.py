@@ -1,13 +1,35 @@
-from typing import Dict, List
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import hashlib
 import json
 import os
+import tempfile
+import aiohttp
 from ..base import SecurityTool
+from ..compile_cache import compiled_target, default_compilation_cache, source_digests
+from .bytecode_cache import BytecodeCache
 from datetime import datetime
 
+# Memory budgeted per concurrent symbolic-execution run, in MiB
+DEFAULT_ANALYSIS_MEMORY_MB = 2048
+
 class MythrilScanner(SecurityTool):
     def __init__(self, config: Dict):
         super().__init__("mythril", config)
         self.infura_key = config.get("infura_key", "")
+        self.max_workers = config.get("max_workers")
+        self.analysis_memory_mb = config.get("analysis_memory_mb", DEFAULT_ANALYSIS_MEMORY_MB)
+        self.rpc_url = config.get("rpc_url", "")
+        self.bytecode_cache_path = config.get("bytecode_cache_path", "mythril_bytecode.db")
+        self._bytecode_cache: Optional[BytecodeCache] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Analysing shared artifacts skips Mythril's own solc run but loses
+        # source mappings, so it is opt-in
+        self.compilation_cache = None
+        if config.get("use_compiled_artifacts", False):
+            self.compilation_cache = config.get("compilation_cache", default_compilation_cache)
+        self.solc_args = config.get("solc_args", "")
+        self.solc_remaps = config.get("solc_remaps", "")
 
     async def setup(self) -> bool:
         """Install and configure Mythril"""
@@ -29,49 +51,156 @@ class MythrilScanner(SecurityTool):
             print(f"Failed to setup Mythril: {e}")
             return False
 
-    async def scan(self, target: str, mode: str = "standard") -> Dict:
+    async def scan(self, target: str, mode: str = "standard", bypass_cache: bool = False) -> Dict:
         """Scan smart contract for vulnerabilities"""
         if not os.path.exists(target) and not target.startswith("0x"):
             raise ValueError("Target must be a file path or contract address")
 
-        command = ["myth", "analyze"]
+        if target.startswith("0x"):
+            return await self.scan_deployed(target, mode, bypass_cache)
+
+        command = ["myth", "analyze", *self._mode_options(mode), target, "--format", "json"]
+
+        async def run() -> Dict:
+            if self.compilation_cache is not None:
+                artifacts = await compiled_target(self.compilation_cache, target, self.solc_args, self.solc_remaps)
+                if artifacts != target:
+                    return await self._scan_artifacts(artifacts, target, mode)
+            return await self._analyze(command, target, mode)
+
+        return await self.cached_scan(target, [mode], run, ["myth", "version"], bypass_cache)
+
+    async def scan_deployed(self, address: str, mode: str = "standard", bypass_cache: bool = False) -> Dict:
+        """Scan the runtime bytecode deployed at ``address``
+
+        The code is fetched with ``eth_getCode`` and analysed offline. Results
+        are stored in a persistent cache keyed by the code's hash, so an
+        address is only re-analysed when its code changes.
+        """
+        code = await self._get_code(address)
+        if code in ("", "0x"):
+            raise ValueError(f"No contract code at {address}")
+
+        code_hash = hashlib.sha256(code.lower().encode()).hexdigest()
+        version = await self.get_version(["myth", "version"])
+        cache = self._get_bytecode_cache()
+        if not bypass_cache:
+            cached = await asyncio.to_thread(cache.get, code_hash, mode, version)
+            if cached is not None:
+                return {
+                    **cached,
+                    "target": address,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "cached": True
+                }
+
+        result = await self._analyze_bytecode(code, address, mode)
+        result["code_hash"] = code_hash
+        if not result.get("error"):
+            await asyncio.to_thread(cache.put, code_hash, mode, version, result)
+        return result
+
+    async def close(self):
+        """Close the RPC session and the bytecode cache"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._bytecode_cache is not None:
+            self._bytecode_cache.close()
+            self._bytecode_cache = None
+
+    async def _scan_artifacts(self, export_path: str, target: str, mode: str) -> Dict:
+        """Analyse the runtime bytecode of each contract ``target`` itself defines"""
+        bytecodes = await asyncio.to_thread(self.compilation_cache.runtime_bytecodes, export_path, target)
+        result = {
+            "tool": self.name,
+            "target": target,
+            "mode": mode,
+            "timestamp": datetime.utcnow().isoformat(),
+            "findings": [],
+            "raw_output": {}
+        }
+        for contract, code in bytecodes.items():
+            contract_result = await self._analyze_bytecode(code, target, mode)
+            if contract_result.get("error"):
+                result["error"] = contract_result["error"]
+            for finding in contract_result["findings"]:
+                if not finding.get("contract") or finding["contract"] == "MAIN":
+                    finding["contract"] = contract
+                result["findings"].append(finding)
+            result["raw_output"][contract] = contract_result["raw_output"]
+        return result
+
+    async def _analyze_bytecode(self, code: str, target: str, mode: str) -> Dict:
+        with tempfile.NamedTemporaryFile("w", suffix=".bin", delete=False) as f:
+            f.write(code[2:] if code.startswith("0x") else code)
+            code_file = f.name
+        try:
+            command = [
+                "myth", "analyze", *self._mode_options(mode),
+                "--bin-runtime", "-f", code_file, "--format", "json"
+            ]
+            return await self._analyze(command, target, mode)
+        finally:
+            os.remove(code_file)
 
-        # Add mode-specific options
+    def _mode_options(self, mode: str) -> List[str]:
         if mode == "quick":
-            command.extend(["--execution-timeout", "90"])
+            return ["--execution-timeout", "90"]
         elif mode == "deep":
-            command.extend(["--execution-timeout", "900", "--max-depth", "50"])
-
-        # Handle different target types
-        if target.startswith("0x"):
-            if not self.infura_key:
-                raise ValueError("Infura API key required for scanning deployed contracts")
-            command.extend(["--rpc", f"infura-mainnet:{self.infura_key}", target])
-        else:
-            command.append(target)
-
-        # Add JSON output format
-        command.extend(["--format", "json"])
+            return ["--execution-timeout", "900", "--max-depth", "50"]
+        return []
 
+    async def _analyze(self, command: List[str], target: str, mode: str) -> Dict:
         stdout, stderr = await self.execute_command(command)
-        try:
-            results = json.loads(stdout)
-        except json.JSONDecodeError:
-            results = {"error": "Failed to parse Mythril output", "raw": stdout}
-
-        return {
+        result = {
             "tool": self.name,
             "target": target,
             "mode": mode,
-            "timestamp": datetime.utcnow().isoformat(),
-            "findings": await self.parse_results(results),
-            "raw_output": results
+            "timestamp": datetime.utcnow().isoformat()
         }
+        try:
+            results = json.loads(stdout)
+        except json.JSONDecodeError:
+            results = {"error": "Failed to parse Mythril output", "raw": stdout}
+            result["error"] = results["error"]
+
+        result["findings"] = await self.parse_results(results)
+        result["raw_output"] = results
+        return result
+
+    def _rpc_endpoint(self) -> str:
+        if self.rpc_url:
+            return self.rpc_url
+        if self.infura_key:
+            return f"https://mainnet.infura.io/v3/{self.infura_key}"
+        raise ValueError("RPC URL or Infura API key required for scanning deployed contracts")
+
+    async def _get_code(self, address: str) -> str:
+        """Fetch the runtime bytecode at ``address`` over JSON-RPC"""
+        endpoint = self._rpc_endpoint()
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60))
+        payload = {"jsonrpc": "2.0", "id": 1, "method": "eth_getCode", "params": [address, "latest"]}
+        async with self._session.post(endpoint, json=payload) as response:
+            body = await response.json(content_type=None)
+        if body.get("error"):
+            raise ValueError(f"eth_getCode failed: {body['error']}")
+        return body.get("result") or "0x"
+
+    def _get_bytecode_cache(self) -> BytecodeCache:
+        if self._bytecode_cache is None:
+            self._bytecode_cache = BytecodeCache(self.bytecode_cache_path)
+        return self._bytecode_cache
 
     async def parse_results(self, results: Dict) -> List[Dict]:
         """Parse Mythril scan results"""
         findings = []
 
+        # ``--format json`` wraps the issues as {"success": ..., "issues": [...]}
+        if isinstance(results, dict):
+            results = results.get("issues") or []
+
         if isinstance(results, list):
             for issue in results:
                 finding = {
@@ -97,62 +226,89 @@ class MythrilScanner(SecurityTool):
         if not os.path.exists(os.path.join(project_path, "truffle-config.js")):
             raise ValueError("Not a valid Truffle project directory")
 
-        contracts_dir = os.path.join(project_path, "contracts")
-        results = []
-
-        for root, _, files in os.walk(contracts_dir):
-            for file in files:
-                if file.endswith(".sol"):
-                    contract_path = os.path.join(root, file)
-                    try:
-                        result = await self.scan(contract_path)
-                        results.append(result)
-                    except Exception as e:
-                        results.append({
-                            "tool": self.name,
-                            "target": contract_path,
-                            "timestamp": datetime.utcnow().isoformat(),
-                            "error": str(e)
-                        })
-
-        return results
+        return [result async for result in self.scan_project(project_path)]
 
     async def scan_hardhat_project(self, project_path: str) -> List[Dict]:
         """Scan all contracts in a Hardhat project"""
         if not os.path.exists(os.path.join(project_path, "hardhat.config.js")):
             raise ValueError("Not a valid Hardhat project directory")
 
-        contracts_dir = os.path.join(project_path, "contracts")
-        results = []
-
-        for root, _, files in os.walk(contracts_dir):
-            for file in files:
+        return [result async for result in self.scan_project(project_path)]
+
+    async def scan_project(
+        self,
+        project_path: str,
+        mode: str = "standard",
+        max_workers: Optional[int] = None
+    ) -> AsyncIterator[Dict]:
+        """Analyse every contract under ``contracts/``, yielding results as they complete
+
+        Files whose content and transitive imports are identical are
+        analysed once and the result is reported for each copy, marked with
+        ``duplicate_of``. Analyses run
+        concurrently, at most ``max_workers`` at a time (see
+        ``analysis_slots``).
+        """
+        by_hash: Dict[str, List[str]] = {}
+        for root, _, files in os.walk(os.path.join(project_path, "contracts")):
+            for file in sorted(files):
                 if file.endswith(".sol"):
                     contract_path = os.path.join(root, file)
-                    try:
-                        result = await self.scan(contract_path)
-                        results.append(result)
-                    except Exception as e:
-                        results.append({
-                            "tool": self.name,
-                            "target": contract_path,
-                            "timestamp": datetime.utcnow().isoformat(),
-                            "error": str(e)
-                        })
-
-        return results
+                    source_hash = await asyncio.to_thread(_source_hash, contract_path)
+                    by_hash.setdefault(source_hash, []).append(contract_path)
+
+        semaphore = asyncio.Semaphore(max_workers or self.analysis_slots())
+
+        async def analyse(paths: List[str]):
+            async with semaphore:
+                try:
+                    return paths, await self.scan(paths[0], mode)
+                except Exception as e:
+                    return paths, {
+                        "tool": self.name,
+                        "target": paths[0],
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "error": str(e)
+                    }
+
+        tasks = [asyncio.ensure_future(analyse(paths)) for paths in by_hash.values()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                paths, result = await next_done
+                yield result
+                for duplicate in paths[1:]:
+                    yield {**result, "target": duplicate, "duplicate_of": paths[0]}
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def analysis_slots(self) -> int:
+        """Number of analyses to run at once: one per core, capped by free memory"""
+        if self.max_workers:
+            return max(1, self.max_workers)
+        slots = os.cpu_count() or 1
+        available = _available_memory()
+        if available:
+            slots = min(slots, available // (self.analysis_memory_mb * 1024 * 1024))
+        return max(1, slots)
 
     async def verify_contract(self, address: str, source_code: str) -> Dict:
         """Verify deployed contract against source code"""
-        # Create temporary file for source code
-        temp_file = f"/tmp/contract_{address}.sol"
+        with tempfile.NamedTemporaryFile("w", suffix=".sol", delete=False) as f:
+            f.write(source_code)
+            temp_file = f.name
         try:
-            with open(temp_file, "w") as f:
-                f.write(source_code)
-
-            # Scan both deployed contract and source
-            deployed_result = await self.scan(address)
-            source_result = await self.scan(temp_file)
+            # Analyse the deployed code and the source concurrently; wait for
+            # both before raising so the source file outlives its analysis
+            deployed_result, source_result = await asyncio.gather(
+                self.scan_deployed(address),
+                self.scan(temp_file),
+                return_exceptions=True
+            )
+            for outcome in (deployed_result, source_result):
+                if isinstance(outcome, BaseException):
+                    raise outcome
 
             return {
                 "tool": self.name,
@@ -199,3 +355,30 @@ class MythrilScanner(SecurityTool):
             })
 
         return differences
+
+def _source_hash(contract_path: str) -> str:
+    """Hash of a contract and everything it imports, independent of where it lives
+
+    Imported files are keyed by their path relative to the contract, so
+    copies only match when their relative imports resolve to identical files.
+    """
+    base = os.path.dirname(contract_path)
+    entries = sorted(
+        ("" if path == contract_path else path if path.startswith("import:") else os.path.relpath(path, base), digest)
+        for path, digest in source_digests(contract_path).items()
+    )
+    return hashlib.sha256(json.dumps(entries).encode()).hexdigest()
+
+def _available_memory() -> Optional[int]:
+    """Bytes of memory available to new processes, if the platform reports it"""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
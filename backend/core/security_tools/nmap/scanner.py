@@ -1,8 +1,23 @@
-from typing import Dict, List
+from typing import AsyncIterator, Deque, Dict, Iterator, List, Optional, Set
+import asyncio
 import json
+import xml.etree.ElementTree as ET
+from collections import deque
 from ..base import SecurityTool
+from ..delta import fingerprint_finding
+from ..web.scanner import masscan_command, parse_masscan_line
 from datetime import datetime
 
+# Number of trailing stderr lines kept for the scan result
+STDERR_TAIL_LINES = 200
+
+# Pipeline defaults: masscan packet rate, hosts per nmap batch, seconds a
+# discovered port may wait for its batch to fill, and concurrent nmap runs
+PIPELINE_RATE = 1000
+PIPELINE_BATCH_HOSTS = 32
+PIPELINE_FLUSH_INTERVAL = 5.0
+PIPELINE_WORKERS = 4
+
 class NmapScanner(SecurityTool):
     def __init__(self, config: Dict):
         super().__init__("nmap", config)
@@ -11,6 +26,13 @@ class NmapScanner(SecurityTool):
             "full": ["-sV", "-sC", "-p-", "--min-rate", "1000"],
             "vuln": ["-sV", "-sC", "--script", "vuln"]
         }
+        # "pipeline" sweeps with masscan and service-scans only what it finds
+        self.pipeline_options = {
+            "rate": config.get("pipeline_rate", PIPELINE_RATE),
+            "batch_hosts": config.get("pipeline_batch_hosts", PIPELINE_BATCH_HOSTS),
+            "flush_interval": config.get("pipeline_flush_interval", PIPELINE_FLUSH_INTERVAL),
+            "workers": config.get("pipeline_workers", PIPELINE_WORKERS)
+        }
 
     async def setup(self) -> bool:
         """Install and configure Nmap"""
@@ -27,57 +49,335 @@ class NmapScanner(SecurityTool):
             print(f"Failed to setup Nmap: {e}")
             return False
 
-    async def scan(self, target: str, scan_type: str = "quick") -> Dict:
+    async def scan(self, target: str, scan_type: str = "quick", bypass_cache: bool = False) -> Dict:
         """Execute Nmap scan with specified options"""
+        if scan_type == "pipeline":
+            return await self.scan_pipeline(target, bypass_cache)
         if scan_type not in self.scan_types:
             scan_type = "quick"
 
-        command = ["nmap"] + self.scan_types[scan_type] + [target]
-        stdout, stderr = await self.execute_command(command)
+        command = ["nmap"] + self.scan_types[scan_type] + ["-oX", "-", target]
+
+        async def run() -> Dict:
+            stderr_tail: Deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+            exit_status: Dict = {}
+            findings = []
+            hosts = 0
+            async for host in self.stream_hosts(command, stderr_tail, exit_status):
+                hosts += 1
+                findings.extend(self._port_findings(host))
+
+            result = {
+                "tool": self.name,
+                "target": target,
+                "scan_type": scan_type,
+                "timestamp": datetime.utcnow().isoformat(),
+                "hosts_scanned": hosts,
+                "findings": findings,
+                "errors": "\n".join(stderr_tail)
+            }
+            error = self.command_error(command, exit_status.get("returncode"), result["errors"])
+            if error:
+                result["error"] = error
+            return result
+
+        return await self.cached_scan(
+            target, self.scan_types[scan_type], run, ["nmap", "--version"], bypass_cache
+        )
+
+    async def scan_pipeline(self, target: str, bypass_cache: bool = False) -> Dict:
+        """Masscan sweep of all ports feeding batched ``nmap -sV -sC`` runs"""
+        async def run() -> Dict:
+            stderr_tail: Deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+            failures: List[str] = []
+            findings = []
+            # A host whose ports span several batches yields several records
+            hosts = set()
+            async for host in self.stream_pipeline(target, stderr_tail=stderr_tail, failures=failures):
+                hosts.add(host["address"])
+                findings.extend(self._port_findings(host))
+
+            result = {
+                "tool": self.name,
+                "target": target,
+                "scan_type": "pipeline",
+                "timestamp": datetime.utcnow().isoformat(),
+                "hosts_scanned": len(hosts),
+                "findings": findings,
+                "errors": "\n".join(stderr_tail)
+            }
+            if failures:
+                result["error"] = "; ".join(failures)
+            return result
+
+        return await self.cached_scan(
+            target, ["pipeline", self.pipeline_options], run, ["nmap", "--version"], bypass_cache
+        )
+
+    async def stream_pipeline(
+        self,
+        target: str,
+        ports: str = "1-65535",
+        stderr_tail: Optional[Deque[str]] = None,
+        failures: Optional[List[str]] = None
+    ) -> AsyncIterator[Dict]:
+        """Yield host records from nmap service scans of masscan's open ports
+
+        Open (host, port) pairs are collected into batches of up to
+        ``batch_hosts`` hosts, or whatever arrived within ``flush_interval``
+        seconds, while masscan keeps sweeping. Each batch is one nmap run
+        over exactly the ports found on its hosts; ports discovered on a
+        host after its batch was sent go out with a later batch. Records
+        only list the ports masscan reported open. A message for each
+        masscan or nmap run that exits unsuccessfully is appended to
+        ``failures`` when given.
+        """
+        options = self.pipeline_options
+        workers = max(1, options["workers"])
+        pairs: asyncio.Queue = asyncio.Queue()
+        batches: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+        results: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+        masscan = masscan_command(target, ports, options["rate"])
+
+        def check(command: List[str], exit_status: Dict):
+            error = self.command_error(command, exit_status.get("returncode"), "\n".join(stderr_tail or []))
+            if error and failures is not None:
+                failures.append(error)
+
+        async def sweep():
+            try:
+                exit_status: Dict = {}
+                async for line in self.execute_command_stream(masscan, stderr_tail=stderr_tail, exit_status=exit_status):
+                    pair = parse_masscan_line(line)
+                    if pair is not None:
+                        await pairs.put(pair)
+                check(masscan, exit_status)
+            finally:
+                await pairs.put(None)
+
+        async def stop_workers():
+            for _ in range(workers):
+                await batches.put(None)
+
+        async def batch():
+            loop = asyncio.get_running_loop()
+            pending: Dict[str, Set[str]] = {}
+            seen: Set[tuple] = set()
+            deadline = None
+            # As in run_concurrent_scans, sentinels are only sent while the
+            # service scans still drain ``batches``; once they are cancelled
+            # a blocking put into the full queue would never return
+            try:
+                while True:
+                    timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                    try:
+                        pair = await asyncio.wait_for(pairs.get(), timeout)
+                    except asyncio.TimeoutError:
+                        # Flush deadline passed without a new pair
+                        pair = ()
+                    if pair is None:
+                        break
+                    if pair and pair not in seen:
+                        seen.add(pair)
+                        pending.setdefault(pair[0], set()).add(pair[1])
+                        if deadline is None:
+                            deadline = loop.time() + options["flush_interval"]
+                    if pending and (len(pending) >= options["batch_hosts"] or loop.time() >= deadline):
+                        await batches.put(pending)
+                        pending, deadline = {}, None
+                if pending:
+                    await batches.put(pending)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await stop_workers()
+                raise
+            await stop_workers()
+
+        async def service_scan():
+            while True:
+                hosts = await batches.get()
+                if hosts is None:
+                    await results.put(None)
+                    return
+                command = self._pipeline_command(hosts)
+                exit_status: Dict = {}
+                try:
+                    async for host in self.stream_hosts(command, stderr_tail, exit_status):
+                        open_ports = hosts.get(host["address"], set())
+                        host["ports"] = [port for port in host["ports"] if port["port"] in open_ports]
+                        await results.put(host)
+                except Exception as e:
+                    # Keep serving batches so the sentinel count still adds up
+                    if failures is not None:
+                        failures.append(f"nmap batch {sorted(hosts)} failed: {e}")
+                    continue
+                check(command, exit_status)
+
+        tasks = [asyncio.create_task(sweep()), asyncio.create_task(batch())]
+        tasks.extend(asyncio.create_task(service_scan()) for _ in range(workers))
+        try:
+            remaining = workers
+            while remaining:
+                host = await results.get()
+                if host is None:
+                    remaining -= 1
+                else:
+                    yield host
+            await asyncio.gather(*tasks[:2])
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _pipeline_command(self, hosts: Dict[str, Set[str]]) -> List[str]:
+        """nmap service scan over the union of the batch's open ports"""
+        tcp = sorted({p.split("/")[0] for ports in hosts.values() for p in ports if p.endswith("/tcp")}, key=int)
+        udp = sorted({p.split("/")[0] for ports in hosts.values() for p in ports if p.endswith("/udp")}, key=int)
+        port_specs = []
+        if tcp:
+            port_specs.append("T:" + ",".join(tcp))
+        command = ["nmap", "-sV", "-sC", "-Pn"]
+        if udp:
+            port_specs.append("U:" + ",".join(udp))
+            command.extend(["-sS", "-sU"])
+        return command + ["-p", ",".join(port_specs), "-oX", "-"] + sorted(hosts)
+
+    def attack_surface(self, result: Dict) -> Optional[str]:
+        """Fingerprint the open ports and service versions in a scan result"""
+        services = sorted(
+            (f["host"] or "", f["port"], f["service"], f["version"])
+            for f in result.get("findings", []) if f.get("state") == "open"
+        )
+        return fingerprint_finding({"services": services})
+
+    async def scan_stream(self, target: str, scan_type: str = "quick") -> AsyncIterator[Dict]:
+        """Yield one record per host as soon as Nmap finishes with it"""
+        if scan_type not in self.scan_types:
+            scan_type = "quick"
+
+        command = ["nmap"] + self.scan_types[scan_type] + ["-oX", "-", target]
+        async for host in self.stream_hosts(command):
+            yield host
+
+    async def stream_hosts(
+        self,
+        command: List[str],
+        stderr_tail: Optional[Deque[str]] = None,
+        exit_status: Optional[Dict] = None
+    ) -> AsyncIterator[Dict]:
+        """Run an ``-oX -`` Nmap command and parse its XML incrementally"""
+        parser = ET.XMLPullParser(events=("start", "end"))
+        state = {}
+        # Long lines (e.g. big script output) arrive in chunks, so they are
+        # fed as-is with their own line endings
+        async for chunk in self.execute_command_stream(
+            command, stderr_tail=stderr_tail, exit_status=exit_status, keep_newlines=True
+        ):
+            parser.feed(chunk)
+            for host in self._drain_hosts(parser, state):
+                yield host
+        parser.close()
+        for host in self._drain_hosts(parser, state):
+            yield host
+
+    async def parse_results(self, raw_output: str) -> List[Dict]:
+        """Parse Nmap XML scan results into per-port findings"""
+        parser = ET.XMLPullParser(events=("start", "end"))
+        state = {}
+        findings = []
+        try:
+            parser.feed(raw_output)
+            parser.close()
+        except ET.ParseError:
+            pass
+
+        for host in self._drain_hosts(parser, state):
+            findings.extend(self._port_findings(host))
+
+        return findings
+
+    def _drain_hosts(self, parser: ET.XMLPullParser, state: Dict) -> Iterator[Dict]:
+        """Yield completed <host> elements
+
+        Every completed direct child of the root (hosts, hosthint,
+        taskprogress, ...) is dropped from the tree so memory stays flat.
+        """
+        for event, elem in parser.read_events():
+            if event == "start":
+                if "root" not in state:
+                    state["root"] = elem
+                state["depth"] = state.get("depth", 0) + 1
+                continue
+
+            state["depth"] -= 1
+            if state["depth"] != 1:
+                continue
+            if elem.tag == "host":
+                yield self._parse_host(elem)
+            state["root"].remove(elem)
+
+    def _parse_host(self, elem: ET.Element) -> Dict:
+        """Convert a <host> element into a host record"""
+        addresses = {a.get("addrtype"): a.get("addr") for a in elem.findall("address")}
+        status = elem.find("status")
+
+        ports = []
+        for port in elem.findall("ports/port"):
+            state = port.find("state")
+            service = port.find("service")
+            version = ""
+            if service is not None:
+                version = " ".join(filter(None, (
+                    service.get("product"),
+                    service.get("version"),
+                    service.get("extrainfo")
+                )))
+            ports.append({
+                "port": f"{port.get('portid')}/{port.get('protocol')}",
+                "state": state.get("state") if state is not None else "",
+                "service": service.get("name", "") if service is not None else "",
+                "version": version,
+                "scripts": self._parse_scripts(port)
+            })
 
-        results = await self.parse_results(stdout)
         return {
-            "tool": self.name,
-            "target": target,
-            "scan_type": scan_type,
-            "timestamp": datetime.utcnow().isoformat(),
-            "findings": results,
-            "raw_output": stdout,
-            "errors": stderr
+            "address": addresses.get("ipv4") or addresses.get("ipv6") or addresses.get("mac"),
+            "mac": addresses.get("mac"),
+            "hostnames": [h.get("name") for h in elem.findall("hostnames/hostname")],
+            "status": status.get("state") if status is not None else "",
+            "ports": ports,
+            "host_scripts": self._parse_scripts(elem.find("hostscript"))
         }
 
-    async def parse_results(self, raw_output: str) -> List[Dict]:
-        """Parse Nmap scan results"""
+    def _parse_scripts(self, elem: Optional[ET.Element]) -> List[Dict]:
+        if elem is None:
+            return []
+        return [
+            {"id": script.get("id"), "output": (script.get("output") or "").strip()}
+            for script in elem.findall("script")
+        ]
+
+    def _port_findings(self, host: Dict) -> List[Dict]:
+        """Flatten a host record into per-port findings"""
         findings = []
-        current_port = None
-        current_service = None
-
-        for line in raw_output.split('\n'):
-            line = line.strip()
-
-            # Parse port information
-            if '/tcp' in line or '/udp' in line:
-                parts = line.split()
-                if len(parts) >= 3:
-                    current_port = {
-                        "port": parts[0],
-                        "state": parts[1],
-                        "service": parts[2],
-                        "version": " ".join(parts[3:]) if len(parts) > 3 else "",
-                        "vulnerabilities": []
-                    }
-                    findings.append(current_port)
-                    current_service = current_port
-
-            # Parse vulnerability information
-            elif current_service and '|' in line:
-                vuln_info = line.split('|')[1].strip()
-                if vuln_info:
-                    current_service["vulnerabilities"].append({
+        for port in host["ports"]:
+            findings.append({
+                "host": host["address"],
+                "hostnames": host["hostnames"],
+                "port": port["port"],
+                "state": port["state"],
+                "service": port["service"],
+                "version": port["version"],
+                "vulnerabilities": [
+                    {
                         "type": "potential_vulnerability",
-                        "description": vuln_info
-                    })
-
+                        "script_id": script["id"],
+                        "description": script["output"]
+                    }
+                    for script in port["scripts"] if script["output"]
+                ]
+            })
         return findings
 
     async def get_os_detection(self, target: str) -> Dict:
@@ -104,10 +404,12 @@ class NmapScanner(SecurityTool):
 
     async def get_service_versions(self, target: str) -> Dict:
         """Perform service version detection"""
-        command = ["nmap", "-sV", "--version-intensity", "5", target]
-        stdout, stderr = await self.execute_command(command)
+        command = ["nmap", "-sV", "--version-intensity", "5", "-oX", "-", target]
+
+        services = []
+        async for host in self.stream_hosts(command):
+            services.extend(self._port_findings(host))
 
         return {
-            "services": await self.parse_results(stdout),
-            "raw_output": stdout
+            "services": services
         }
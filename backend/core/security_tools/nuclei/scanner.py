@@ -1,10 +1,23 @@
-from typing import Dict, List
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Union
+import inspect
 import json
 import os
+from collections import deque
 from ..base import SecurityTool
 from datetime import datetime
 
+# Number of trailing stderr lines kept for the scan result
+STDERR_TAIL_LINES = 200
+
+# Longest JSONL line buffered before it is split into chunks; findings are
+# requested without raw request/response bodies, so this is ample
+LINE_LIMIT = 8 * 1024 * 1024
+
+FindingCallback = Callable[[Dict], Union[None, Awaitable[None]]]
+
 class NucleiScanner(SecurityTool):
+    surface_dependent = True
+
     def __init__(self, config: Dict):
         super().__init__("nuclei", config)
         self.templates_dir = os.path.expanduser("~/.nuclei-templates")
@@ -31,51 +44,118 @@ class NucleiScanner(SecurityTool):
             print(f"Failed to setup Nuclei: {e}")
             return False
 
-    async def scan(self, target: str, tags: List[str] = None) -> Dict:
-        """Execute Nuclei scan with specified options"""
-        command = ["nuclei", "-u", target, "-json"]
+    async def scan(
+        self,
+        target: str,
+        tags: List[str] = None,
+        on_finding: Optional[FindingCallback] = None,
+        bypass_cache: bool = False
+    ) -> Dict:
+        """Execute Nuclei scan with specified options
+
+        Findings are parsed as nuclei prints them; ``on_finding`` (sync or
+        async) is called with each one as soon as it is available, or with
+        every cached finding when the result is served from the cache.
+        """
+        command = self._build_command(target, tags)
+
+        async def run() -> Dict:
+            return await self._collect(command, {"target": target}, on_finding)
+
+        result = await self.cached_scan(
+            target, sorted(tags or []), run, ["nuclei", "-version"], bypass_cache
+        )
+        if result.get("cached") and on_finding is not None:
+            for finding in result["findings"]:
+                await self._publish(on_finding, finding)
+        return result
+
+    async def scan_stream(self, target: str, tags: List[str] = None) -> AsyncIterator[Dict]:
+        """Yield Nuclei findings for a target as they are reported"""
+        async for finding in self.stream_findings(self._build_command(target, tags)):
+            yield finding
+
+    def _build_command(self, target: str, tags: List[str] = None) -> List[str]:
+        command = ["nuclei", "-u", target, "-json", "-omit-raw"]
 
         # Add tag filters
         if tags:
             command.extend(["-tags", ",".join(tags)])
 
-        stdout, stderr = await self.execute_command(command)
-        results = await self.parse_results(stdout)
+        return command
 
-        return {
-            "tool": self.name,
-            "target": target,
-            "timestamp": datetime.utcnow().isoformat(),
-            "findings": results,
-            "raw_output": stdout,
-            "errors": stderr
-        }
+    async def stream_findings(
+        self,
+        command: List[str],
+        stderr_tail: Optional[Deque[str]] = None,
+        exit_status: Optional[Dict] = None
+    ) -> AsyncIterator[Dict]:
+        """Run a nuclei command and parse its JSONL output line by line"""
+        async for line in self.execute_command_stream(command, LINE_LIMIT, stderr_tail, exit_status):
+            finding = self._parse_line(line)
+            if finding is not None:
+                yield finding
 
     async def parse_results(self, raw_output: str) -> List[Dict]:
         """Parse Nuclei scan results"""
         findings = []
         for line in raw_output.split('\n'):
-            if not line.strip():
-                continue
-
-            try:
-                result = json.loads(line)
-                finding = {
-                    "template_id": result.get("template-id"),
-                    "template_name": result.get("info", {}).get("name"),
-                    "type": result.get("type"),
-                    "matched": result.get("matched"),
-                    "description": result.get("info", {}).get("description"),
-                    "tags": result.get("info", {}).get("tags", []),
-                    "reference": result.get("info", {}).get("reference", []),
-                    "timestamp": result.get("timestamp")
-                }
+            finding = self._parse_line(line)
+            if finding is not None:
                 findings.append(finding)
-            except json.JSONDecodeError:
-                continue
 
         return findings
 
+    def _parse_line(self, line: str) -> Optional[Dict]:
+        """Parse a single JSONL line of nuclei output"""
+        if not line.strip():
+            return None
+
+        try:
+            result = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+
+        return {
+            "template_id": result.get("template-id"),
+            "template_name": result.get("info", {}).get("name"),
+            "type": result.get("type"),
+            "matched": result.get("matched"),
+            "severity": result.get("info", {}).get("severity"),
+            "classification": result.get("info", {}).get("classification", {}),
+            "description": result.get("info", {}).get("description"),
+            "tags": result.get("info", {}).get("tags", []),
+            "reference": result.get("info", {}).get("reference", []),
+            "timestamp": result.get("timestamp")
+        }
+
+    async def _collect(self, command: List[str], result: Dict, on_finding: Optional[FindingCallback] = None) -> Dict:
+        """Stream a nuclei run into a scan result dict"""
+        stderr_tail: Deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+        exit_status: Dict = {}
+        findings = []
+        async for finding in self.stream_findings(command, stderr_tail, exit_status):
+            findings.append(finding)
+            if on_finding is not None:
+                await self._publish(on_finding, finding)
+
+        result = {
+            "tool": self.name,
+            **result,
+            "timestamp": datetime.utcnow().isoformat(),
+            "findings": findings,
+            "errors": "\n".join(stderr_tail)
+        }
+        error = self.command_error(command, exit_status.get("returncode"), result["errors"])
+        if error:
+            result["error"] = error
+        return result
+
+    async def _publish(self, on_finding: FindingCallback, finding: Dict):
+        callback_result = on_finding(finding)
+        if inspect.isawaitable(callback_result):
+            await callback_result
+
     async def list_templates(self, tags: List[str] = None) -> List[Dict]:
         """List available Nuclei templates"""
         command = ["nuclei", "-tl"]
@@ -111,16 +191,5 @@ class NucleiScanner(SecurityTool):
         if not os.path.exists(template_path):
             raise FileNotFoundError(f"Template not found: {template_path}")
 
-        command = ["nuclei", "-u", target, "-t", template_path, "-json"]
-        stdout, stderr = await self.execute_command(command)
-        results = await self.parse_results(stdout)
-
-        return {
-            "tool": self.name,
-            "target": target,
-            "template": template_path,
-            "timestamp": datetime.utcnow().isoformat(),
-            "findings": results,
-            "raw_output": stdout,
-            "errors": stderr
-        }
+        command = ["nuclei", "-u", target, "-t", template_path, "-json", "-omit-raw"]
+        return await self._collect(command, {"target": target, "template": template_path})
@@ -0,0 +1,161 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import sqlite3
+import threading
+from datetime import datetime
+
+# Bulk inserts are committed in batches of this many names
+INSERT_BATCH_SIZE = 5000
+
+class SubdomainIndex:
+    """Persistent index of discovered hostnames backed by SQLite
+
+    Names are stored under a reversed-label key (``api.example.com`` becomes
+    ``com.example.api``) in a clustered ``WITHOUT ROWID`` table, so every
+    name under a domain is one contiguous range scan. Each name records the
+    run that first and last saw it and a bitmask of the sources that
+    reported it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                scope TEXT NOT NULL,
+                started_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sources (
+                name TEXT PRIMARY KEY,
+                bit INTEGER NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS hosts (
+                rkey TEXT PRIMARY KEY,
+                first_run INTEGER NOT NULL,
+                last_run INTEGER NOT NULL,
+                sources INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS hosts_first_run ON hosts (first_run);
+        """)
+        self._source_bits: Dict[str, int] = dict(self._conn.execute("SELECT name, bit FROM sources"))
+
+    def start_run(self, scope: str) -> int:
+        """Record a new recon run over ``scope`` and return its id"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (scope, started_at) VALUES (?, ?)",
+                (scope, datetime.utcnow().isoformat())
+            )
+            return cursor.lastrowid
+
+    def last_run(self, scope: str) -> Optional[int]:
+        """Return the id of the most recent run over ``scope``"""
+        row = self._conn.execute(
+            "SELECT MAX(id) FROM runs WHERE scope = ?", (scope,)
+        ).fetchone()
+        return row[0]
+
+    def add(self, run_id: int, names: Iterable[Tuple[str, Iterable[str]]]) -> int:
+        """Insert or refresh (name, sources) pairs seen in ``run_id``
+
+        Returns the number of names that were not in the index before.
+        """
+        added = 0
+        batch: List[Tuple[str, int, int, int]] = []
+        with self._lock:
+            for name, sources in names:
+                batch.append((reverse_labels(name), run_id, run_id, self._source_mask(sources)))
+                if len(batch) >= INSERT_BATCH_SIZE:
+                    added += self._upsert(batch)
+                    batch = []
+            if batch:
+                added += self._upsert(batch)
+        return added
+
+    def new_since(self, run_id: int, domain: Optional[str] = None) -> Iterator[str]:
+        """Yield names first seen after ``run_id``, optionally under ``domain``"""
+        query = "SELECT rkey FROM hosts WHERE first_run > ?"
+        params: Tuple = (run_id,)
+        if domain:
+            low, high = _suffix_range(domain)
+            query += " AND ((rkey >= ? AND rkey < ?) OR rkey = ?)"
+            params += (low, high, reverse_labels(domain))
+        for (rkey,) in self._conn.execute(query + " ORDER BY rkey", params):
+            yield reverse_labels(rkey)
+
+    def under(self, domain: str) -> Iterator[str]:
+        """Yield every indexed name under ``domain`` (``*.`` prefix allowed)
+
+        ``api.example.com`` includes the name itself; ``*.api.example.com``
+        only its subdomains.
+        """
+        include_self = not domain.startswith("*.")
+        domain = domain[2:] if not include_self else domain
+        low, high = _suffix_range(domain)
+        if include_self and domain in self:
+            yield normalize(domain)
+        for (rkey,) in self._conn.execute(
+            "SELECT rkey FROM hosts WHERE rkey >= ? AND rkey < ? ORDER BY rkey", (low, high)
+        ):
+            yield reverse_labels(rkey)
+
+    def sources(self, name: str) -> List[str]:
+        """Return the sources that have reported ``name``"""
+        row = self._conn.execute(
+            "SELECT sources FROM hosts WHERE rkey = ?", (reverse_labels(name),)
+        ).fetchone()
+        if row is None:
+            return []
+        return sorted(source for source, bit in self._source_bits.items() if row[0] & (1 << bit))
+
+    def close(self):
+        self._conn.close()
+
+    def __contains__(self, name: str) -> bool:
+        return self._conn.execute(
+            "SELECT 1 FROM hosts WHERE rkey = ?", (reverse_labels(name),)
+        ).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM hosts").fetchone()[0]
+
+    def _upsert(self, batch: List[Tuple[str, int, int, int]]) -> int:
+        with self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO hosts (rkey, first_run, last_run, sources) VALUES (?, ?, ?, ?)",
+                batch
+            )
+            added = self._conn.total_changes - before
+            self._conn.executemany(
+                "UPDATE hosts SET last_run = ?, sources = sources | ? WHERE rkey = ?",
+                [(run_id, mask, rkey) for rkey, _, run_id, mask in batch]
+            )
+        return added
+
+    def _source_mask(self, sources: Iterable[str]) -> int:
+        mask = 0
+        for source in sources:
+            if source not in self._source_bits:
+                bit = len(self._source_bits)
+                if bit >= 63:
+                    raise ValueError("SubdomainIndex supports at most 63 distinct sources")
+                with self._conn:
+                    self._conn.execute("INSERT INTO sources (name, bit) VALUES (?, ?)", (source, bit))
+                self._source_bits[source] = bit
+            mask |= 1 << self._source_bits[source]
+        return mask
+
+def normalize(name: str) -> str:
+    return name.strip().lower().rstrip(".")
+
+def reverse_labels(name: str) -> str:
+    """``api.example.com`` <-> ``com.example.api``"""
+    return ".".join(reversed(normalize(name).split(".")))
+
+def _suffix_range(domain: str) -> Tuple[str, str]:
+    """Key range holding every strict subdomain of ``domain``"""
+    prefix = reverse_labels(domain) + "."
+    return prefix, prefix[:-1] + "/"
@@ -1,11 +1,28 @@
-from typing import Dict, List
+from typing import Deque, Dict, Iterable, List, Optional, Set
+from collections import deque
+import asyncio
 import os
 from ..base import SecurityTool
+from .index import SubdomainIndex
 from datetime import datetime
 
+# Subdomain enumerators; the target domain is appended to each command.
+# amass runs its default active enumeration unless ``amass_passive`` is set
+ENUMERATORS = {
+    "subfinder": ["subfinder", "-silent", "-d"],
+    "amass": ["amass", "enum", "-d"],
+    "assetfinder": ["assetfinder", "--subs-only"],
+    "findomain": ["findomain", "--quiet", "-t"]
+}
+
 class ReconScanner(SecurityTool):
     def __init__(self, config: Dict):
         super().__init__("recon", config)
+        index_path = config.get("index_path")
+        self.index: Optional[SubdomainIndex] = SubdomainIndex(index_path) if index_path else None
+        self.enumerators = dict(ENUMERATORS)
+        if config.get("amass_passive", False):
+            self.enumerators["amass"] = ["amass", "enum", "-passive", "-d"]
 
     async def setup(self) -> bool:
         """Install and configure reconnaissance tools"""
@@ -53,8 +70,27 @@ class ReconScanner(SecurityTool):
             print(f"Failed to setup reconnaissance tools: {e}")
             return False
 
-    async def scan(self, target: str) -> Dict:
-        """Run all reconnaissance tools against a target"""
+    async def scan(self, target: str, bypass_cache: bool = False) -> Dict:
+        """Run all reconnaissance tools against a target
+
+        Every run, cached or not, is recorded in the subdomain index, and
+        findings are flagged ``new`` against the index's previous run.
+        """
+        result = await self.cached_scan(
+            target, sorted(self.enumerators.items()), lambda: self._run_scan(target), bypass_cache=bypass_cache
+        )
+        if self.index is None or result.get("error"):
+            return result
+
+        subdomains = {finding["finding"]: set(finding["sources"]) for finding in result["findings"]}
+        new_names = await asyncio.to_thread(self._record_run, target, subdomains)
+        return {
+            **result,
+            "new_count": len(new_names),
+            "findings": [{**finding, "new": finding["finding"] in new_names} for finding in result["findings"]]
+        }
+
+    async def _run_scan(self, target: str) -> Dict:
         results = {
             "tool": self.name,
             "target": target,
@@ -62,24 +98,88 @@ class ReconScanner(SecurityTool):
             "findings": []
         }
 
-        # Run each tool
-        tools = {
-            "subfinder": ["subfinder", "-d", target],
-            "amass": ["amass", "enum", "-d", target],
-            "assetfinder": ["assetfinder", target],
-            "findomain": ["findomain", "-t", target],
-            "dnsx": ["dnsx", "-d", target]
-        }
+        failures: List[str] = []
+        subdomains = await self.enumerate_subdomains(target, failures)
+        if len(failures) == len(self.enumerators):
+            results["error"] = "; ".join(failures)
+            return results
+        resolved = await self.resolve_subdomains(target, subdomains, failures)
+        if failures:
+            results["partial"] = True
+            results["errors"] = failures
+
+        for name in sorted(subdomains):
+            results["findings"].append({
+                "finding": name,
+                "sources": sorted(subdomains[name]),
+                "resolved": name in resolved
+            })
+
+        return results
+
+    def _record_run(self, target: str, subdomains: Dict[str, Set[str]]) -> Set[str]:
+        """Store a run in the subdomain index and return the names it added"""
+        domain = self._normalize_hostname(target)
+        previous_run = self.index.last_run(domain) or 0
+        self.index.add(self.index.start_run(domain), subdomains.items())
+        return set(self.index.new_since(previous_run, domain))
+
+    async def enumerate_subdomains(self, target: str, failures: Optional[List[str]] = None) -> Dict[str, Set[str]]:
+        """Run the enumerators concurrently and merge their output
 
-        for tool_name, command in tools.items():
+        Returns each normalized subdomain mapped to the set of tools that
+        reported it. Enumerators that fail or exit non-zero are appended to
+        ``failures`` when given.
+        """
+        domain = self._normalize_hostname(target)
+        subdomains: Dict[str, Set[str]] = {}
+
+        async def run(tool_name: str, command: List[str]):
+            exit_status: Dict = {}
+            stderr_tail: Deque[str] = deque(maxlen=20)
             try:
-                stdout, stderr = await self.execute_command(command)
-                results["findings"].extend(self.parse_tool_output(tool_name, stdout))
+                async for line in self.execute_command_stream(command, stderr_tail=stderr_tail, exit_status=exit_status):
+                    name = self._extract_hostname(line, domain)
+                    if name:
+                        subdomains.setdefault(name, set()).add(tool_name)
+                error = self.command_error(command, exit_status.get("returncode"), "\n".join(stderr_tail))
             except Exception as e:
-                print(f"Error running {tool_name}: {e}")
+                error = f"{tool_name}: {e}"
+            if error:
+                print(f"Error running {tool_name}: {error}")
+                if failures is not None:
+                    failures.append(error)
 
-        return results
+        await asyncio.gather(*(
+            run(tool_name, command + [domain])
+            for tool_name, command in self.enumerators.items()
+        ))
+        return subdomains
+
+    async def resolve_subdomains(self, target: str, subdomains: Iterable[str], failures: Optional[List[str]] = None) -> Set[str]:
+        """Resolve subdomains with a single bulk dnsx call over stdin"""
+        names = "\n".join(subdomains)
+        if not names:
+            return set()
+
+        domain = self._normalize_hostname(target)
+        command = ["dnsx", "-silent"]
+        try:
+            stdout, stderr, returncode = await self.execute_command_status(command, input_data=names.encode())
+            error = self.command_error(command, returncode, stderr)
+        except Exception as e:
+            stdout, error = "", f"dnsx: {e}"
+        if error:
+            print(f"Error running dnsx: {error}")
+            if failures is not None:
+                failures.append(error)
 
+        resolved = set()
+        for line in stdout.split('\n'):
+            name = self._extract_hostname(line, domain)
+            if name:
+                resolved.add(name)
+        return resolved
 
     def parse_tool_output(self, tool_name: str, output: str) -> List[Dict]:
         """Parse tool output into structured format"""
@@ -91,3 +191,30 @@ class ReconScanner(SecurityTool):
                     "finding": line.strip()
                 })
         return findings
+
+    async def parse_results(self, raw_output: str) -> List[Dict]:
+        """Parse enumerator output into unique hostname findings"""
+        seen = set()
+        findings = []
+        for line in raw_output.split('\n'):
+            for token in line.split():
+                name = self._normalize_hostname(token)
+                if "." in name and name not in seen:
+                    seen.add(name)
+                    findings.append({"finding": name})
+        return findings
+
+    def _extract_hostname(self, line: str, domain: str) -> Optional[str]:
+        """Pick the in-scope hostname out of a line of tool output"""
+        for token in reversed(line.split()):
+            name = self._normalize_hostname(token)
+            if name == domain or name.endswith("." + domain):
+                return name
+        return None
+
+    @staticmethod
+    def _normalize_hostname(name: str) -> str:
+        name = name.strip().lower().rstrip(".")
+        if name.startswith("*."):
+            name = name[2:]
+        return name
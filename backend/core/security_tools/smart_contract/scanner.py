@@ -2,11 +2,22 @@ from typing import Dict, List
 import os
 import json
 from ..base import SecurityTool
+from ..compile_cache import compiled_target, default_compilation_cache
 from datetime import datetime
 
 class SmartContractScanner(SecurityTool):
+    version_commands = {
+        "slither": ["slither", "--version"],
+        "manticore": ["manticore", "--version"]
+    }
+
     def __init__(self, config: Dict):
         super().__init__("smart_contract", config)
+        self.compilation_cache = None
+        if config.get("shared_compilation", True):
+            self.compilation_cache = config.get("compilation_cache", default_compilation_cache)
+        self.solc_args = config.get("solc_args", "")
+        self.solc_remaps = config.get("solc_remaps", "")
 
     async def setup(self) -> bool:
         """Install and configure smart contract analysis tools"""
@@ -23,8 +34,7 @@ class SmartContractScanner(SecurityTool):
             print(f"Failed to setup smart contract analysis tools: {e}")
             return False
 
-    async def scan(self, target: str, tool: str = None) -> Dict:
-        """Run smart contract security scan with specified tool"""
+    async def _run_scan(self, target: str, tool: str = None) -> Dict:
         results = {
             "tool": self.name,
             "target": target,
@@ -32,15 +42,24 @@ class SmartContractScanner(SecurityTool):
             "findings": []
         }
 
+        if tool not in ("slither", "manticore"):
+            return results
+
+        # Both tools accept a crytic-compile export in place of sources
+        artifacts = await compiled_target(self.compilation_cache, target, self.solc_args, self.solc_remaps)
         if tool == "slither":
-            stdout, stderr = await self.execute_command(["slither", target, "--json", "-"])
+            stdout, stderr = await self.execute_command(["slither", artifacts, "--json", "-"])
             results["findings"].extend(self.parse_slither_output(stdout))
         elif tool == "manticore":
-            stdout, stderr = await self.execute_command(["manticore", target, "--workspace", "/tmp/manticore"])
+            stdout, stderr = await self.execute_command(["manticore", artifacts, "--workspace", "/tmp/manticore"])
             results["findings"].extend(self.parse_manticore_output(stdout))
 
         return results
 
+    async def parse_results(self, raw_output: str) -> List[Dict]:
+        """Parse Slither JSON output"""
+        return self.parse_slither_output(raw_output)
+
     def parse_slither_output(self, output: str) -> List[Dict]:
         findings = []
         try:
@@ -1,9 +1,38 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+import json
 import os
+import re
 from ..base import SecurityTool
 from datetime import datetime
 
+# Exit statuses other than 0 that still mean the tool ran to completion
+SUCCESS_EXIT_CODES = {
+    "nikto": (0, 1),
+    "semgrep": (0, 1)
+}
+
+MASSCAN_OPEN_PORT = re.compile(r"Discovered open port (\d+)/(\w+) on (\S+)")
+
+def masscan_command(target: str, ports: str = "1-65535", rate: int = 1000) -> List[str]:
+    """masscan sweep of ``ports`` on ``target`` at ``rate`` packets per second"""
+    return ["masscan", target, f"-p{ports}", f"--rate={rate}"]
+
+def parse_masscan_line(line: str) -> Optional[Tuple[str, str]]:
+    """``(host, "port/proto")`` from a masscan "Discovered open port" line"""
+    match = MASSCAN_OPEN_PORT.search(line)
+    if match is None:
+        return None
+    port, protocol, host = match.groups()
+    return host, f"{port}/{protocol}"
+
 class WebScanner(SecurityTool):
+    version_commands = {
+        "sqlmap": ["sqlmap", "--version"],
+        "nikto": ["nikto", "-Version"],
+        "masscan": ["masscan", "--version"],
+        "semgrep": ["semgrep", "--version"]
+    }
+
     def __init__(self, config: Dict):
         super().__init__("web", config)
 
@@ -44,8 +73,7 @@ class WebScanner(SecurityTool):
             print(f"Failed to setup web security tools: {e}")
             return False
 
-    async def scan(self, target: str, tool: str = None) -> Dict:
-        """Run web security scan with specified tool"""
+    async def _run_scan(self, target: str, tool: str = None) -> Dict:
         results = {
             "tool": self.name,
             "target": target,
@@ -53,17 +81,22 @@ class WebScanner(SecurityTool):
             "findings": []
         }
 
+        command = None
         if tool == "sqlmap":
-            stdout, stderr = await self.execute_command(["sqlmap", "-u", target, "--batch"])
+            command = ["sqlmap", "-u", target, "--batch"]
+            stdout, stderr, returncode = await self.execute_command_status(command)
             results["findings"].extend(self.parse_sqlmap_output(stdout))
         elif tool == "nikto":
-            stdout, stderr = await self.execute_command(["nikto", "-h", target, "-Format", "json"])
+            command = ["nikto", "-h", target, "-Format", "json"]
+            stdout, stderr, returncode = await self.execute_command_status(command)
             results["findings"].extend(self.parse_nikto_output(stdout))
         elif tool == "masscan":
-            stdout, stderr = await self.execute_command(["masscan", target, "-p1-65535", "--rate=1000"])
+            command = masscan_command(target)
+            stdout, stderr, returncode = await self.execute_command_status(command)
             results["findings"].extend(self.parse_masscan_output(stdout))
         elif tool == "semgrep":
-            stdout, stderr = await self.execute_command(["semgrep", "--config", "auto", target])
+            command = ["semgrep", "--config", "auto", target]
+            stdout, stderr, returncode = await self.execute_command_status(command)
             results["findings"].extend(self.parse_semgrep_output(stdout))
         elif tool == "zap":
             # Start ZAP in daemon mode
@@ -71,8 +104,17 @@ class WebScanner(SecurityTool):
             # TODO: Implement ZAP API integration
             pass
 
+        if command is not None:
+            error = self.command_error(command, returncode, stderr, SUCCESS_EXIT_CODES.get(tool, (0,)))
+            if error:
+                results["error"] = error
+
         return results
 
+    async def parse_results(self, raw_output: str) -> List[Dict]:
+        """Parse masscan console output"""
+        return self.parse_masscan_output(raw_output)
+
     def parse_sqlmap_output(self, output: str) -> List[Dict]:
         findings = []
         for line in output.split('\n'):
@@ -88,7 +130,8 @@ class WebScanner(SecurityTool):
                 findings.append({
                     "id": item.get("id"),
                     "message": item.get("message"),
-                    "url": item.get("url")
+                    "url": item.get("url"),
+                    "port": data.get("port")
                 })
         except json.JSONDecodeError:
             pass
@@ -97,8 +140,9 @@ class WebScanner(SecurityTool):
     def parse_masscan_output(self, output: str) -> List[Dict]:
         findings = []
         for line in output.split('\n'):
-            if "Discovered open port" in line:
-                findings.append({"port": line.strip()})
+            pair = parse_masscan_line(line)
+            if pair is not None:
+                findings.append({"port": line.strip(), "host": pair[0], "service_port": pair[1]})
         return findings
 
     def parse_semgrep_output(self, output: str) -> List[Dict]:
@@ -1,8 +1,48 @@
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from api.v1.predict import predict_batch
 from api.v1.router import router as v1_router
+from core.ai_engine.detection.batcher import MicroBatcher
+from core.jobs.queue import JobQueue
+from core.jobs.worker import ScanWorkerPool
+from core.models.base import Base
+from core.models.database import SessionLocal, engine
+from core.models.vulnerability import Vulnerability
 
-app = FastAPI(title="Bug Bounty Tool API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    Base.metadata.create_all(bind=engine)
+    app.state.job_queue = JobQueue(os.environ.get("SCAN_QUEUE_PATH", "scan_jobs.db"))
+    app.state.worker_pool = ScanWorkerPool(
+        app.state.job_queue,
+        workers=int(os.environ.get("SCAN_WORKERS", "2")),
+        tool_config={
+            "mobsf": {
+                "api_key": os.environ.get("MOBSF_API_KEY", ""),
+                "host": os.environ.get("MOBSF_HOST", "http://localhost:8000")
+            },
+            "mythril": {
+                "rpc_url": os.environ.get("MYTHRIL_RPC_URL", ""),
+                "infura_key": os.environ.get("INFURA_API_KEY", "")
+            }
+        },
+        session_factory=SessionLocal
+    )
+    app.state.worker_pool.start()
+    app.state.prediction_batcher = MicroBatcher(
+        predict_batch,
+        max_batch_size=int(os.environ.get("PREDICT_BATCH_SIZE", "64")),
+        max_delay=float(os.environ.get("PREDICT_MAX_DELAY_MS", "5")) / 1000
+    )
+    app.state.prediction_batcher.start()
+    yield
+    await app.state.prediction_batcher.stop()
+    await app.state.worker_pool.stop()
+    app.state.job_queue.close()
+
+app = FastAPI(title="Bug Bounty Tool API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,40 @@
+from core.security_tools.findings import normalize_result
+
+CVE = "CVE-2021-41773"
+
+def fingerprints(target: str, nikto_port=None):
+    results = [
+        {"tool": "nuclei", "target": target, "findings": [{
+            "template_id": CVE.lower(),
+            "template_name": "Apache 2.4.49 - Path Traversal",
+            "severity": "high",
+            "matched": "https://example.com/cgi-bin/.%2e/.%2e/etc/passwd",
+            "classification": {"cve-id": [CVE.lower()]}
+        }]},
+        {"tool": "nmap", "target": target, "findings": [{
+            "host": "93.184.216.34",
+            "hostnames": ["example.com"],
+            "port": "443/tcp",
+            "vulnerabilities": [{"script_id": "http-vuln-cve2021-41773", "description": f"VULNERABLE: {CVE}"}]
+        }]},
+        {"tool": "web", "target": target, "findings": [{
+            "id": "999957",
+            "message": f"/cgi-bin/: Apache path traversal ({CVE}).",
+            "url": "/cgi-bin/",
+            "port": nikto_port
+        }]}
+    ]
+    return {record["fingerprint"] for result in results for record in normalize_result(result)}
+
+def test_same_cve_from_nuclei_nmap_and_nikto_shares_a_fingerprint():
+    assert len(fingerprints("example.com", nikto_port="443")) == 1
+
+def test_url_target_without_nikto_port_shares_a_fingerprint():
+    assert len(fingerprints("https://example.com")) == 1
+
+def test_nmap_range_target_locates_by_scanned_host():
+    result = {"tool": "nmap", "target": "93.184.216.0/24", "findings": [{
+        "host": "93.184.216.34", "hostnames": [], "port": "443/tcp",
+        "vulnerabilities": [{"script_id": "x", "description": CVE}]
+    }]}
+    assert normalize_result(result)[0]["location"] == "93.184.216.34:443"
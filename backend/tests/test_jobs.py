@@ -0,0 +1,68 @@
+import asyncio
+from typing import Dict, List
+
+from core.jobs import worker
+from core.jobs.queue import COMPLETED, FAILED, QUEUED, JobQueue
+from core.jobs.worker import ScanWorkerPool
+from core.security_tools.base import SecurityTool
+
+class BrokenTool(SecurityTool):
+    def __init__(self, config: Dict):
+        super().__init__("broken", {"result_cache": None})
+
+    async def setup(self) -> bool:
+        return True
+
+    async def scan(self, target: str) -> Dict:
+        raise FileNotFoundError("broken: command not found")
+
+    async def parse_results(self, raw_output: str) -> List[Dict]:
+        return []
+
+class WorkingTool(BrokenTool):
+    def __init__(self, config: Dict):
+        SecurityTool.__init__(self, "working", {"result_cache": None})
+
+    async def scan(self, target: str) -> Dict:
+        return {"tool": self.name, "target": target, "findings": []}
+
+def run_job(tmp_path, monkeypatch, tools: List[str]) -> Dict:
+    monkeypatch.setitem(worker.TOOL_CLASSES, "broken", BrokenTool)
+    monkeypatch.setitem(worker.TOOL_CLASSES, "working", WorkingTool)
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = queue.enqueue("example.com", tools)
+    asyncio.run(ScanWorkerPool(queue)._run_job(queue.claim()))
+    return queue.get(job_id)
+
+def test_job_fails_when_every_tool_errors(tmp_path, monkeypatch):
+    job = run_job(tmp_path, monkeypatch, ["broken"])
+    assert job["status"] == FAILED
+    assert "command not found" in job["error"]
+
+def test_job_completes_when_some_tool_succeeds(tmp_path, monkeypatch):
+    assert run_job(tmp_path, monkeypatch, ["broken", "working"])["status"] == COMPLETED
+
+def test_recover_fails_jobs_out_of_attempts(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    queue = JobQueue(path, max_attempts=2)
+    job_id = queue.enqueue("example.com", ["nmap"])
+    for _ in range(2):
+        queue.claim()
+        queue.close()
+        queue = JobQueue(path, max_attempts=2)
+    job = queue.get(job_id)
+    assert job["status"] == FAILED
+    assert job["attempts"] == 2
+
+def test_recover_requeues_jobs_with_attempts_left(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    queue = JobQueue(path, max_attempts=2)
+    job_id = queue.enqueue("example.com", ["nmap"])
+    queue.claim()
+    queue.close()
+    assert JobQueue(path, max_attempts=2).get(job_id)["status"] == QUEUED
+
+def test_concurrent_option_caps_tool_concurrency():
+    pool = ScanWorkerPool(queue=None)
+    orchestrator = pool.build_orchestrator(["nmap", "nuclei", "recon"], {"concurrent": "2"})
+    assert orchestrator.max_concurrency == 2
@@ -0,0 +1,48 @@
+import asyncio
+import os
+from typing import Dict
+
+from core.security_tools.mythril.scanner import MythrilScanner
+
+CONTRACT = 'import "./Config.sol";\ncontract Vault is Config {}\n'
+
+def write(path: str, content: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+def scan_project(project: str) -> Dict[str, Dict]:
+    scanner = MythrilScanner({"result_cache": None, "max_workers": 2})
+    analysed = []
+
+    async def scan(target: str, mode: str = "standard", bypass_cache: bool = False) -> Dict:
+        analysed.append(target)
+        return {"tool": "mythril", "target": target, "findings": []}
+
+    scanner.scan = scan
+
+    async def run():
+        return {r["target"]: r async for r in scanner.scan_project(project)}
+
+    results = asyncio.run(run())
+    return results, analysed
+
+def test_identical_copies_are_analysed_once(tmp_path):
+    for name in ("a", "b"):
+        write(str(tmp_path / "contracts" / name / "Vault.sol"), CONTRACT)
+        write(str(tmp_path / "contracts" / name / "Config.sol"), "contract Config { uint x = 1; }\n")
+
+    results, analysed = scan_project(str(tmp_path))
+    vaults = [path for path in results if path.endswith("Vault.sol")]
+    assert len(vaults) == 2
+    assert sum(path.endswith("Vault.sol") for path in analysed) == 1
+    assert any(results[path].get("duplicate_of") for path in vaults)
+
+def test_copies_importing_different_files_are_analysed_separately(tmp_path):
+    for name, value in (("a", 1), ("b", 2)):
+        write(str(tmp_path / "contracts" / name / "Vault.sol"), CONTRACT)
+        write(str(tmp_path / "contracts" / name / "Config.sol"), f"contract Config {{ uint x = {value}; }}\n")
+
+    results, analysed = scan_project(str(tmp_path))
+    assert sum(path.endswith("Vault.sol") for path in analysed) == 2
+    assert not any(result.get("duplicate_of") for result in results.values())
@@ -0,0 +1,43 @@
+import asyncio
+
+from core.security_tools.nmap.scanner import NmapScanner
+
+def make_scanner(host_delay: float) -> NmapScanner:
+    scanner = NmapScanner({
+        "result_cache": None,
+        "pipeline_batch_hosts": 1,
+        "pipeline_flush_interval": 0.01,
+        "pipeline_workers": 1
+    })
+
+    async def sweep(command, buffer_limit=None, stderr_tail=None, exit_status=None):
+        for i in range(50):
+            yield f"Discovered open port 80/tcp on 10.0.0.{i}"
+        if exit_status is not None:
+            exit_status["returncode"] = 0
+
+    async def service_scan(command, stderr_tail=None, exit_status=None):
+        await asyncio.sleep(host_delay)
+        if exit_status is not None:
+            exit_status["returncode"] = 0
+        for address in command[command.index("-") + 1:]:
+            yield {"address": address, "hostnames": [], "status": "up", "ports": []}
+
+    scanner.execute_command_stream = sweep
+    scanner.stream_hosts = service_scan
+    return scanner
+
+def test_pipeline_scans_every_discovered_host():
+    result = asyncio.run(asyncio.wait_for(make_scanner(0).scan("10.0.0.0/24", "pipeline"), 5))
+    assert result["hosts_scanned"] == 50
+    assert "error" not in result
+
+def test_pipeline_cancels_cleanly_on_timeout():
+    async def run():
+        try:
+            await asyncio.wait_for(make_scanner(10).scan("10.0.0.0/24", "pipeline"), 0.5)
+        except asyncio.TimeoutError:
+            return True
+        return False
+
+    assert asyncio.run(asyncio.wait_for(run(), 5))
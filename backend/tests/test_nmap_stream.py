@@ -0,0 +1,27 @@
+import asyncio
+import sys
+
+from core.security_tools.nmap.scanner import NmapScanner
+
+# One <script> element far longer than the stream buffer, written on a single
+# line the way nmap does, so chunk boundaries land inside character references
+# and between multi-byte characters
+NMAP_OUTPUT = """
+import sys
+output = "&#xa;".join("cipher %d &#x2014; \\u2014 &amp;&#xa;&#xa;" % i for i in range(6000))
+sys.stdout.write('<?xml version="1.0"?>\\n<nmaprun>\\n<hosthint><status state="up"/></hosthint>\\n')
+sys.stdout.write('<host><status state="up"/>\\n<address addr="10.0.0.1" addrtype="ipv4"/>\\n<ports>')
+sys.stdout.write('<port protocol="tcp" portid="443"><state state="open"/><service name="https"/>')
+sys.stdout.write('<script id="ssl-enum-ciphers" output="' + output + '"/></port>\\n')
+sys.stdout.write('</ports>\\n</host>\\n<runstats/>\\n</nmaprun>\\n')
+"""
+
+def test_stream_hosts_parses_script_output_longer_than_buffer():
+    async def run():
+        scanner = NmapScanner({"result_cache": None})
+        return [host async for host in scanner.stream_hosts([sys.executable, "-c", NMAP_OUTPUT])]
+
+    hosts = asyncio.run(asyncio.wait_for(run(), 10))
+    assert len(hosts) == 1
+    assert hosts[0]["address"] == "10.0.0.1"
+    assert [port["port"] for port in hosts[0]["ports"]] == ["443/tcp"]
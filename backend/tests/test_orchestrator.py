@@ -0,0 +1,73 @@
+import asyncio
+from typing import Dict, List
+
+from core.security_tools.base import SecurityTool, ToolOrchestrator
+
+class SleepTool(SecurityTool):
+    """Tool whose scans just sleep, for exercising the orchestrator"""
+
+    def __init__(self, name: str, delay: float):
+        super().__init__(name, {"result_cache": None})
+        self.delay = delay
+
+    async def setup(self) -> bool:
+        return True
+
+    async def scan(self, target: str) -> Dict:
+        await asyncio.sleep(self.delay)
+        return {"tool": self.name, "target": target, "findings": []}
+
+    async def parse_results(self, raw_output: str) -> List[Dict]:
+        return []
+
+def make_orchestrator(delay: float = 0.01, timeout: float = None) -> ToolOrchestrator:
+    orchestrator = ToolOrchestrator(timeout=timeout)
+    orchestrator.register_tool(SleepTool("fast", delay))
+    orchestrator.register_tool(SleepTool("also_fast", delay))
+    return orchestrator
+
+def test_run_concurrent_scans_yields_every_pair():
+    async def run():
+        targets = [f"host{i}" for i in range(10)]
+        return [r async for r in make_orchestrator().run_concurrent_scans(targets, workers=2)]
+
+    results = asyncio.run(asyncio.wait_for(run(), 5))
+    assert len(results) == 20
+    assert not any(r.get("error") for r in results)
+
+def test_run_concurrent_scans_closes_after_early_break():
+    async def run():
+        targets = [f"host{i}" for i in range(100)]
+        scans = make_orchestrator().run_concurrent_scans(targets, workers=2)
+        seen = 0
+        async for _ in scans:
+            seen += 1
+            if seen == 5:
+                break
+        await asyncio.wait_for(scans.aclose(), 1)
+        return seen
+
+    assert asyncio.run(asyncio.wait_for(run(), 5)) == 5
+
+def test_run_concurrent_scans_cancels_cleanly_on_timeout():
+    async def consume():
+        targets = [f"host{i}" for i in range(100)]
+        async for _ in make_orchestrator(delay=0.05).run_concurrent_scans(targets, workers=2):
+            pass
+
+    async def run():
+        try:
+            await asyncio.wait_for(consume(), 0.2)
+        except asyncio.TimeoutError:
+            return True
+        return False
+
+    assert asyncio.run(asyncio.wait_for(run(), 5))
+
+def test_tool_timeout_becomes_error_result():
+    async def run():
+        orchestrator = make_orchestrator(delay=1, timeout=0.05)
+        return [r async for r in orchestrator.run_concurrent_scans(["host"], workers=2)]
+
+    results = asyncio.run(asyncio.wait_for(run(), 5))
+    assert [r["error"] for r in results] == ["Timed out after 0.05s"] * 2
@@ -0,0 +1,43 @@
+import asyncio
+import sys
+from typing import Dict, List
+
+from core.security_tools.base import SecurityTool
+from core.security_tools.cache import ResultCache
+
+class SuiteScanner(SecurityTool):
+    version_commands = {"cached": [sys.executable, "--version"]}
+
+    def __init__(self):
+        super().__init__("suite", {"result_cache": ResultCache()})
+        self.runs: List[str] = []
+
+    async def setup(self) -> bool:
+        return True
+
+    async def _run_scan(self, target: str, tool: str = None) -> Dict:
+        self.runs.append(tool)
+        return {"tool": self.name, "target": target, "findings": []}
+
+    async def parse_results(self, raw_output: str) -> List[Dict]:
+        return []
+
+def test_listed_tools_are_served_from_the_cache():
+    async def run():
+        scanner = SuiteScanner()
+        first = await scanner.scan("example.com", "cached")
+        second = await scanner.scan("example.com", "cached")
+        return scanner.runs, first, second
+
+    runs, first, second = asyncio.run(run())
+    assert runs == ["cached"]
+    assert "cached" not in first and second["cached"] is True
+
+def test_unlisted_tools_always_run():
+    async def run():
+        scanner = SuiteScanner()
+        await scanner.scan("example.com", "uncached")
+        await scanner.scan("example.com", "uncached")
+        return scanner.runs
+
+    assert asyncio.run(run()) == ["uncached", "uncached"]
@@ -70,16 +70,15 @@ export default function ScanPage() {
     setLoading(true);
     setError('');
     try {
-      const response = await fetch('/api/scan', {
+      const response = await fetch('/api/v1/scans', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
         body: JSON.stringify({
-          scanType,
           target,
           tools: selectedTools,
-          options: scanOptions,
+          options: { ...scanOptions, scanType },
         }),
       });
 
@@ -89,7 +88,7 @@ export default function ScanPage() {
 
       const result = await response.json();
       // Redirect to scan results page
-      window.location.href = `/scan/${result.scanId}`;
+      window.location.href = `/scan/${result.id}`;
 
     } catch (err) {
       setError(err instanceof Error ? err.message : 'An error occurred');
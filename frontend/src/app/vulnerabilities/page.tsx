@@ -125,12 +125,12 @@ export default function VulnerabilitiesPage() {
 
   const fetchVulnerabilities = async () => {
     try {
-      const response = await fetch('/api/vulnerabilities');
+      const response = await fetch('/api/v1/vulnerabilities');
       if (!response.ok) {
         throw new Error('Failed to fetch vulnerabilities');
       }
       const data = await response.json();
-      setVulnerabilities(data);
+      setVulnerabilities(data.items);
     } catch (err) {
       setError(err instanceof Error ? err.message : 'An error occurred');
     } finally {